@@ -0,0 +1,223 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from collections import deque
+from GameFiles.ers_game import Game
+from GameFiles.game_action import GameAction
+from GameFiles.game_event import GameEvent
+from GameFiles.batch_engine import BatchEngine
+from GameFiles.card import CARDS
+from GameFiles.slap_rules import slap_pattern
+from Players.player import Player
+from Players.preplay import Preplay
+from Players.decision_table import TablePlayer, TablePreplay, TableRandomFake
+from Simulation.tournament import DEFAULT_ROSTER, build_players, game_seed, play_seeded_game
+from Benchmarks.bench_scheduler import make_ticks, run_scheduler
+
+## Benchmark suite of the engine hot paths
+# Every benchmark runs from a fixed seed and reports seconds per operation (best
+# of several repeats). Results are written as JSON and can be compared against a
+# stored baseline, e.g.
+#   python -m Benchmarks.bench_engine --baseline Benchmarks/baseline.json
+#   python -m Benchmarks.bench_engine card_play games_4p --output new.json
+
+BASELINE_PATH = "Benchmarks/baseline.json"
+SEED = 2024
+
+# Larger tables extend the default roster
+ROSTERS = {
+    "4p": DEFAULT_ROSTER,
+    "6p": DEFAULT_ROSTER + [(Preplay, "Ava"), (Player, "Noah")],
+    "8p": DEFAULT_ROSTER + [(Preplay, "Ava"), (Player, "Noah"), (Player, "Mia"), (Preplay, "Leo")],
+    # The default roster with compiled decision table strategies
+    "4p_table": [(TableRandomFake, "Jonathan"), (TablePreplay, "Dylan"), (TablePlayer, "Liam"), (TablePlayer, "Kuli")],
+}
+
+# Dealt game with a started event, ready for actions to be handled
+def make_game(roster, seed):
+    random.seed(seed)
+    game = Game(build_players(roster), seed=seed)
+    game.game_event = GameEvent(game.current_player)
+    game.publish_event_state()
+    return game
+
+## Micro-benchmarks, each returns (operations, seconds)
+
+# Slap pattern of the pile top and the slap check of Game.is_slappable
+def bench_slap_detection(seed, ops=200000):
+    rng = random.Random(seed)
+    piles = [deque(rng.sample(CARDS, 3)) for _ in range(1000)]
+    game = make_game(DEFAULT_ROSTER, seed)
+    player = game.players[0]
+    start = time.perf_counter()
+    for i in range(ops):
+        game.slap_pattern = slap_pattern(piles[i % 1000])
+        game.is_slappable(player)
+    return ops, time.perf_counter() - start
+
+# Players playing in turn through Game.handle_new_action until a pile is won or a hand runs out
+def bench_card_play(seed, games=2000):
+    ops = 0
+    elapsed = 0.0
+    for i in range(games):
+        game = make_game(DEFAULT_ROSTER, game_seed(seed, i))
+        start = time.perf_counter()
+        while not game.pile_winner and not game.skip_players:
+            game.handle_new_action(GameAction("Card", game.current_player, 0.0))
+            ops += 1
+        elapsed += time.perf_counter() - start
+    return ops, elapsed
+
+# Game.take_pile of piles built from the players' hands
+def bench_pile_pickup(seed, ops=20000):
+    rng = random.Random(seed)
+    game = make_game(DEFAULT_ROSTER, seed)
+    elapsed = 0.0
+    for _ in range(ops):
+        for player in game.players:
+            for _ in range(rng.randint(1, 5)):
+                if len(player.hand) > 1:
+                    game.pile.append(player.hand.popleft())
+        player = rng.choice(game.players)
+        start = time.perf_counter()
+        game.take_pile(player)
+        elapsed += time.perf_counter() - start
+    return ops, elapsed
+
+# Player.react_to_event of a roster over seeded events
+def bench_react_to_event(roster, events=20000):
+    def bench(seed):
+        rng = random.Random(seed)
+        game = make_game(roster, seed)
+        rotation = game.player_rotation
+        stream = []
+        for _ in range(events):
+            event = GameEvent(rng.choice(rotation))
+            event.cards = rng.sample(CARDS, rng.randint(0, 1))
+            event.player_rotation = rotation
+            event.slappable_pattern = slap_pattern(rng.sample(CARDS, 3))
+            event.new_pile = rng.random() < 0.05
+            stream.append(event)
+        start = time.perf_counter()
+        for event in stream:
+            for player in rotation:
+                player.react_to_event(event)
+        return events * len(rotation), time.perf_counter() - start
+    return bench
+
+# ActionScheduler push and drain of one tick of actions
+def bench_scheduler(seed, ticks=20000):
+    batch = make_ticks(ticks, 4, seed)
+    start = time.perf_counter()
+    run_scheduler(batch)
+    return ticks, time.perf_counter() - start
+
+## Macro-benchmarks of whole games on a single core
+
+def bench_games(roster, games, **game_options):
+    def bench(seed):
+        start = time.perf_counter()
+        for i in range(games):
+            play_seeded_game(roster, game_seed(seed, i), **game_options)
+        return games, time.perf_counter() - start
+    return bench
+
+def bench_batch(roster, games):
+    def bench(seed):
+        start = time.perf_counter()
+        BatchEngine(roster, batch_size=games, seed=seed).run(games)
+        return games, time.perf_counter() - start
+    return bench
+
+# name -> (unit of one operation, benchmark)
+BENCHMARKS = {
+    "slap_detection": ("check", bench_slap_detection),
+    "card_play": ("card", bench_card_play),
+    "pile_pickup": ("pickup", bench_pile_pickup),
+    "react_to_event": ("reaction", bench_react_to_event(ROSTERS["4p"])),
+    "react_to_event_table": ("reaction", bench_react_to_event(ROSTERS["4p_table"])),
+    "scheduler_tick": ("tick", bench_scheduler),
+    "games_4p": ("game", bench_games(ROSTERS["4p"], 200)),
+    "games_6p": ("game", bench_games(ROSTERS["6p"], 100)),
+    "games_8p": ("game", bench_games(ROSTERS["8p"], 100)),
+    "games_4p_table": ("game", bench_games(ROSTERS["4p_table"], 200)),
+    "games_4p_low_alloc": ("game", bench_games(ROSTERS["4p"], 200, low_alloc=True)),
+    "batch_games_4p": ("game", bench_batch(ROSTERS["4p"], 4000)),
+}
+
+# Run the selected benchmarks and return the machine-readable results
+def run_benchmarks(names=None, repeat=3, seed=SEED):
+    results = {}
+    for name in names or BENCHMARKS:
+        unit, bench = BENCHMARKS[name]
+        best = None
+        for _ in range(repeat):
+            ops, seconds = bench(seed)
+            if best is None or seconds / ops < best:
+                best = seconds / ops
+        results[name] = {"unit": unit, "ops": ops, "sec_per_op": best, "ops_per_sec": 1 / best}
+    return {
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": results,
+    }
+
+# Ratio of baseline to current time per op of every benchmark in both runs,
+# above 1 is faster than the baseline. Benchmarks missing from the baseline get no ratio
+def compare(results, baseline, tolerance=0.1):
+    rows = []
+    for name, current in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            rows.append({"name": name, "speedup": None, "regression": False})
+            continue
+        speedup = baseline["benchmarks"][name]["sec_per_op"] / current["sec_per_op"]
+        rows.append({"name": name, "speedup": speedup, "regression": speedup < 1 - tolerance})
+    return rows
+
+def format_results(results, comparison=None):
+    speedups = {row["name"]: row for row in comparison or []}
+    lines = [f"{'benchmark':<22}{'us/op':>12}{'ops/sec':>14}{'vs baseline':>14}"]
+    for name, result in results["benchmarks"].items():
+        line = f"{name:<22}{result['sec_per_op'] * 1e6:>12.3f}{result['ops_per_sec']:>14.1f}"
+        if name in speedups:
+            row = speedups[name]
+            if row["speedup"] is None:
+                line += f"{'no baseline':>14}"
+            else:
+                line += f"{row['speedup']:>13.2f}x" + (" REGRESSION" if row["regression"] else "")
+        lines.append(line)
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ERS engine hot paths")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per benchmark, the best is kept")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help=f"compare against a stored baseline (e.g. {BASELINE_PATH})")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(args.names, repeat=args.repeat)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            comparison = compare(results, json.load(file), args.tolerance)
+    print(format_results(results, comparison))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    # A failing exit status lets a regression stop a script
+    if comparison and any(row["regression"] for row in comparison):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
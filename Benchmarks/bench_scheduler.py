@@ -0,0 +1,41 @@
+import random
+import timeit
+from queue import PriorityQueue
+from GameFiles.action_scheduler import ActionScheduler
+from GameFiles.game_action import GameAction
+from Players.player import Player
+
+## Per-tick cost of ordering player actions: queue.PriorityQueue vs ActionScheduler
+
+def make_ticks(ticks, players, seed=0):
+    rng = random.Random(seed)
+    roster = [Player(f"P{i}") for i in range(players)]
+    return [[GameAction("Wait", player, rng.uniform(0.25, 0.8)) for player in roster] for _ in range(ticks)]
+
+def run_priority_queue(ticks):
+    queue = PriorityQueue(len(ticks[0]))
+    for actions in ticks:
+        for action in random.sample(actions, len(actions)):
+            queue.put(action)
+        while not queue.empty():
+            queue.get()
+
+def run_scheduler(ticks):
+    scheduler = ActionScheduler(0)
+    for actions in ticks:
+        for action in actions:
+            scheduler.push(action)
+        for action in scheduler.drain():
+            pass
+
+def main(ticks=20000, players=4, repeat=5):
+    batch = make_ticks(ticks, players)
+    queue_time = min(timeit.repeat(lambda: run_priority_queue(batch), number=1, repeat=repeat))
+    scheduler_time = min(timeit.repeat(lambda: run_scheduler(batch), number=1, repeat=repeat))
+    print(f"{players} players, {ticks} ticks")
+    print(f"PriorityQueue:   {queue_time / ticks * 1e6:.2f} us/tick")
+    print(f"ActionScheduler: {scheduler_time / ticks * 1e6:.2f} us/tick")
+    print(f"Speedup: {queue_time / scheduler_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
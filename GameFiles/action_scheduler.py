@@ -0,0 +1,29 @@
+import random
+from GameFiles.game_action import GameAction
+
+## Single-threaded scheduler of the actions of one tick
+# Actions are collected into a batch of (time, tiebreak, sequence, action) tuples
+# and resolved in order of reaction time. Equal times are ordered by a seeded
+# random tiebreak, so the outcome does not depend on the order players were asked.
+# Games pass the draw of their tie break stream, otherwise one is seeded from seed
+class ActionScheduler:
+    def __init__(self, seed=None, tiebreak=None):
+        self.tiebreak = tiebreak or random.Random(seed).random
+        self.batch = []
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.batch)
+
+    # Add a player's action to the current tick
+    def push(self, action: GameAction):
+        self.sequence += 1
+        self.batch.append((action.time, self.tiebreak(), self.sequence, action))
+
+    # Remove and return the actions of the current tick in resolution order
+    def drain(self):
+        batch = self.batch
+        batch.sort()
+        actions = [entry[3] for entry in batch]
+        batch.clear()
+        return actions
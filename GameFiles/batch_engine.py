@@ -0,0 +1,435 @@
+import numpy as np
+from GameFiles.card import RANKS, RANK_INDEX
+from GameFiles.slap_rules import GAP_PATTERNS, PAIR_PATTERNS, RANK_COUNT, ROYAL_CARDS, SLAP_PATTERN_CODES
+from Players.player import Player
+from Players.never_slap import NeverSlap
+from Players.random_fake import RandomFake
+from Players.preplay import Preplay
+
+## Lockstep batch engine simulating many games at once with NumPy arrays
+# Every game of the batch holds its hands, pile, turn and royal state in arrays,
+# and all games advance one tick at a time. Player decisions follow the built-in
+# strategies exactly, so the engine reproduces the rules of Game.play_game
+
+# Strategy codes of the built-in player classes
+PLAYER, NEVER_SLAP, RANDOM_FAKE, PREPLAY = range(4)
+STRATEGY_CODES = {Player: PLAYER, NeverSlap: NEVER_SLAP, RandomFake: RANDOM_FAKE, Preplay: PREPLAY}
+
+# Action codes
+NO_ACTION, MOVEMENT, CARD, SLAP, LEAVE, WAIT, FAKE = range(7)
+
+DECK_SIZE = len(RANKS) * 4
+JACK = RANK_INDEX['J']
+PAIR_TABLE = np.array([SLAP_PATTERN_CODES[pattern] for pattern in PAIR_PATTERNS], dtype=np.int8)
+GAP_TABLE = np.array([SLAP_PATTERN_CODES[pattern] for pattern in GAP_PATTERNS], dtype=np.int8)
+ROYAL_TABLE = np.array(ROYAL_CARDS, dtype=np.int8)
+
+# Get the strategy code of a roster entry's class
+def strategy_code(player_class):
+    if player_class not in STRATEGY_CODES:
+        raise ValueError(f"{player_class.__name__} has no batch engine strategy")
+    return STRATEGY_CODES[player_class]
+
+class BatchEngine:
+    def __init__(self, roster, batch_size=8192, seed=0, max_ticks=100000, max_piles=10000, decks=1):
+        self.roster = roster
+        self.names = [name for _, name in roster]
+        self.codes = np.array([strategy_code(player_class) for player_class, _ in roster], dtype=np.int8)
+        self.batch_size = batch_size
+        self.players = len(roster)
+        self.max_ticks = max_ticks
+        self.max_piles = max_piles
+        # Cards dealt per game, hands and piles are sized to hold all of them
+        self.deck_size = DECK_SIZE * decks
+        self.rng = np.random.default_rng(seed)
+        self.has_preplay = bool(np.any(self.codes == PREPLAY))
+
+    # Allocate the state arrays of K game slots
+    def allocate(self, K):
+        P = self.players
+        self.hands = np.zeros((K, P, self.deck_size), dtype=np.int8)
+        self.head = np.zeros((K, P), dtype=np.int64)
+        self.count = np.zeros((K, P), dtype=np.int64)
+        self.pile = np.zeros((K, self.deck_size), dtype=np.int8)
+        self.pile_n = np.zeros(K, dtype=np.int64)
+        self.burned = np.zeros((K, self.deck_size), dtype=np.int8)
+        self.burned_n = np.zeros(K, dtype=np.int64)
+        self.alive = np.zeros((K, P), dtype=bool)
+        self.skip = np.zeros((K, P), dtype=bool)
+        self.strategy = np.zeros((K, P), dtype=np.int8)
+        self.slapper = np.zeros((K, P), dtype=bool)
+        self.preplayer = np.zeros((K, P), dtype=bool)
+        self.faker = np.zeros((K, P), dtype=bool)
+        self.seating = np.zeros((K, P), dtype=np.int64)
+        self.base_reaction = np.zeros((K, P))
+        self.queued_type = np.zeros((K, P), dtype=np.int8)
+        self.queued_time = np.zeros((K, P))
+        self.current = np.zeros(K, dtype=np.int64)
+        self.played_royal = np.full(K, -1, dtype=np.int64)
+        self.cards_to_play = np.zeros(K, dtype=np.int64)
+        self.pile_winner = np.full(K, -1, dtype=np.int64)
+        self.slapped = np.full(K, -1, dtype=np.int64)
+        self.pattern = np.zeros(K, dtype=np.int8)
+        self.waited_turns = np.zeros(K, dtype=np.int64)
+        self.ticks = np.zeros(K, dtype=np.int64)
+        self.piles = np.zeros(K, dtype=np.int64)
+        self.game_index = np.full(K, -1, dtype=np.int64)
+        self.active = np.zeros(K, dtype=bool)
+        # Event the players react to this tick
+        self.event_turn = np.zeros(K, dtype=np.int64)
+        self.event_new_pile = np.zeros(K, dtype=bool)
+        self.event_pile_winner = np.full(K, -1, dtype=np.int64)
+        self.event_movements = np.zeros((K, P), dtype=bool)
+        self.event_royal = np.zeros(K, dtype=bool)
+        self.memory_top = np.full(K, -1, dtype=np.int64)
+        # Event built while the tick's actions resolve
+        self.next_turn = np.zeros(K, dtype=np.int64)
+        self.next_new_pile = np.zeros(K, dtype=bool)
+        self.next_pile_winner = np.full(K, -1, dtype=np.int64)
+        self.next_movements = np.zeros((K, P), dtype=bool)
+        self.card_pushed = np.zeros(K, dtype=bool)
+        # Cached rotation neighbours
+        self.before = np.zeros((K, P), dtype=np.int64)
+        self.rotation_changed = np.zeros(K, dtype=bool)
+        # Arrays holding one row per game slot
+        self.slot_arrays = [name for name, value in vars(self).items()
+                            if isinstance(value, np.ndarray) and name != "codes"]
+
+    # Shuffle, seat and deal new games into the given slots
+    def start_games(self, slots, game_numbers):
+        n = len(slots)
+        P = self.players
+        self.seating[slots] = np.argsort(self.rng.random((n, P)), axis=1)
+        self.strategy[slots] = self.codes[self.seating[slots]]
+        self.slapper[slots] = self.strategy[slots] != NEVER_SLAP
+        self.preplayer[slots] = self.strategy[slots] == PREPLAY
+        self.faker[slots] = self.strategy[slots] == RANDOM_FAKE
+        self.base_reaction[slots] = self.rng.uniform(0.25, 0.3, (n, P))
+        # Card ranks of a shuffled deck per game
+        deck = np.argsort(self.rng.random((n, self.deck_size)), axis=1) % RANK_COUNT
+        per_player = self.deck_size // P
+        remainder = self.deck_size % P
+        self.hands[slots] = 0
+        self.hands[slots, :, :per_player] = deck[:, :per_player * P].reshape(n, P, per_player)
+        self.head[slots] = 0
+        self.count[slots] = per_player
+        self.burned[slots, :remainder] = deck[:, per_player * P:]
+        self.burned_n[slots] = remainder
+        self.pile_n[slots] = 0
+        self.alive[slots] = True
+        self.skip[slots] = False
+        self.queued_type[slots] = NO_ACTION
+        self.current[slots] = 0
+        self.played_royal[slots] = -1
+        self.cards_to_play[slots] = 0
+        self.pile_winner[slots] = -1
+        self.slapped[slots] = -1
+        self.pattern[slots] = 0
+        self.waited_turns[slots] = 0
+        self.ticks[slots] = 0
+        self.piles[slots] = 0
+        self.game_index[slots] = game_numbers
+        self.active[slots] = True
+        self.event_turn[slots] = 0
+        self.event_new_pile[slots] = False
+        self.event_pile_winner[slots] = -1
+        self.event_movements[slots] = False
+        self.event_royal[slots] = False
+        self.memory_top[slots] = -1
+        self.rotation_changed[slots] = True
+
+    # Drop finished slots once the batch has no more games to start
+    def compact(self):
+        keep = np.nonzero(self.active)[0]
+        for name in self.slot_arrays:
+            setattr(self, name, getattr(self, name)[keep])
+
+    ## Player decisions
+    # Every seat's action is picked in the order Player.react_to_event checks them,
+    # and the actions that change the game are returned as sparse (game, seat, type, time) arrays
+    def react(self):
+        K, P = self.alive.shape
+        seats = np.arange(P)[None, :]
+        empty = self.count == 0
+        turn = self.event_turn[:, None] == seats
+        # New pile clears queued actions and players without cards leave
+        new_pile = self.event_new_pile[:, None]
+        queued_type = self.queued_type * ~new_pile
+        leave = new_pile & empty
+        # Queued actions from the previous event
+        queued = (queued_type != NO_ACTION) & ~leave
+        decided = leave | queued
+        # Pile winner slaps to collect the pile, others slap on a pattern
+        slap = ((self.event_pile_winner[:, None] == seats) | ((self.pattern > 0)[:, None] & self.slapper)) & ~decided
+        decided |= slap
+        turn_moved = (self.event_movements & turn).any(axis=1)
+        preslap = self.preplayer & ((self.memory_top == JACK) & turn_moved)[:, None] & ~decided
+        decided |= preslap
+        # Play logic for players with cards
+        play = turn & ~empty & ~decided
+        if self.has_preplay:
+            before = self.player_before()
+            before_moved = np.zeros((K, P), dtype=bool)
+            for seat in range(P):
+                before_moved |= (before == seat) & self.event_movements[:, seat:seat + 1]
+            play |= self.preplayer & ~empty & ~decided & before_moved & ~self.event_royal[:, None]
+        fake = play & turn & self.faker & (self.rng.random((K, P)) > .6)
+        # Waits only count for the player whose turn it is, so the other waits are dropped
+        wait = ~decided & ~play | preslap
+        action_type = (leave * LEAVE + queued * queued_type + slap * SLAP + play * MOVEMENT
+                       + (wait & turn) * WAIT - (queued & (queued_type == FAKE) & ~turn) * FAKE)
+        action_type *= self.alive & self.active[:, None]
+
+        # Actions queued for the next event
+        self.queued_type = (play * CARD + preslap * SLAP + fake * (FAKE - CARD)).astype(np.int8)
+        prediction = (self.base_reaction + self.rng.random((K, P)) * 0.5) / 4
+
+        games, seats = np.nonzero(action_type)
+        types = action_type[games, seats]
+        times = self.base_reaction[games, seats] + self.rng.random(games.size) * 0.5
+        from_queue = queued[games, seats]
+        times[from_queue] = self.queued_time[games[from_queue], seats[from_queue]]
+        times[types == LEAVE] = -1.0
+        self.queued_time = prediction
+        return games, seats, types, times
+
+    # Seat right before each seat in the rotation, recomputed only for games whose rotation changed
+    def player_before(self):
+        games = np.nonzero(self.rotation_changed)[0]
+        if games.size:
+            P = self.players
+            offsets = (np.arange(P)[:, None] - np.arange(1, P + 1)[None, :]) % P
+            rotation = self.alive[games] & ~self.skip[games]
+            first = np.argmax(rotation[:, offsets], axis=2)
+            self.before[games] = offsets[np.arange(P)[None, :], first]
+            self.rotation_changed[games] = False
+        return self.before
+
+    ## Action resolution
+    # Actions resolve in order of reaction time within each game, one rank at a time across games
+    def resolve(self, games, seats, types, times):
+        if not games.size:
+            return
+        # Games come sorted, so sort by time within each game
+        order = np.argsort(games * 4.0 + times, kind="stable")
+        games, seats, types = games[order], seats[order], types[order]
+        index = np.arange(games.size)
+        first = np.ones(games.size, dtype=bool)
+        first[1:] = games[1:] != games[:-1]
+        rank = index - np.maximum.accumulate(np.where(first, index, 0))
+        handlers = (None, self.handle_movement, self.handle_card, self.handle_slap,
+                    self.handle_leave, self.handle_wait, self.handle_wait)
+        for position in range(rank.max() + 1):
+            selected = rank == position
+            slot_games, slot_seats, slot_types = games[selected], seats[selected], types[selected]
+            for code in np.unique(slot_types):
+                match = slot_types == code
+                handlers[code](slot_games[match], slot_seats[match])
+
+    def handle_movement(self, games, seats):
+        self.next_movements[games, seats] = True
+
+    def handle_leave(self, games, seats):
+        self.alive[games, seats] = False
+        self.rotation_changed[games] = True
+        self.current[games] = self.next_turn[games]
+
+    def handle_card(self, games, seats):
+        has_card = self.count[games, seats] > 0
+        games, seats = games[has_card], seats[has_card]
+        ranks = self.pop_card(games, seats)
+        in_turn = self.current[games] == seats
+        self.burn(games[~in_turn], ranks[~in_turn])
+        self.play_to_pile(games[in_turn], seats[in_turn], ranks[in_turn])
+        out = self.count[games, seats] == 0
+        self.temp_remove(games[out], seats[out])
+
+    def handle_slap(self, games, seats):
+        valid = (self.pattern[games] > 0) | (self.pile_winner[games] == seats)
+        # Slapping first wins the pile
+        good, good_seats = games[valid], seats[valid]
+        first = self.slapped[good] < 0
+        self.slapped[good[first]] = good_seats[first]
+        # Miss slaps burn a card if they have one
+        bad, bad_seats = games[~valid], seats[~valid]
+        has_card = self.count[bad, bad_seats] > 0
+        bad, bad_seats = bad[has_card], bad_seats[has_card]
+        if bad.size:
+            self.burn(bad, self.pop_card(bad, bad_seats))
+            out = self.count[bad, bad_seats] == 0
+            self.temp_remove(bad[out], bad_seats[out])
+
+    def handle_wait(self, games, seats):
+        turn = self.next_turn[games] == seats
+        games, seats = games[turn], seats[turn]
+        self.waited_turns[games] += 1
+        # Burn a card after waiting for more than 3 turns
+        burn = (self.waited_turns[games] > 3) & (self.count[games, seats] > 0)
+        games, seats = games[burn], seats[burn]
+        if games.size:
+            self.burn(games, self.pop_card(games, seats))
+            out = self.count[games, seats] == 0
+            self.temp_remove(games[out], seats[out])
+
+    def pop_card(self, games, seats):
+        head = self.head[games, seats]
+        ranks = self.hands[games, seats, head]
+        self.head[games, seats] = (head + 1) % self.deck_size
+        self.count[games, seats] -= 1
+        return ranks
+
+    def burn(self, games, ranks):
+        if not games.size:
+            return
+        self.burned[games, self.burned_n[games]] = ranks
+        self.burned_n[games] += 1
+
+    def play_to_pile(self, games, seats, ranks):
+        size = self.pile_n[games]
+        self.pile[games, size] = ranks
+        self.pile_n[games] = size + 1
+        self.card_pushed[games] = True
+        # Slap pattern of the new top cards
+        top = ranks.astype(np.int64) * RANK_COUNT
+        second = self.pile[games, np.maximum(size - 1, 0)]
+        third = self.pile[games, np.maximum(size - 2, 0)]
+        pattern = np.where(size >= 1, PAIR_TABLE[top + second], 0)
+        gap = np.where(size >= 2, GAP_TABLE[top + third], 0)
+        self.pattern[games] = np.where(pattern > 0, pattern, gap)
+        # Royal sequences
+        royal_cards = ROYAL_TABLE[ranks]
+        royal = royal_cards > 0
+        self.played_royal[games[royal]] = seats[royal]
+        self.cards_to_play[games[royal]] = royal_cards[royal]
+        self.next_player(games[royal])
+        countdown = games[~royal & (self.played_royal[games] >= 0)]
+        self.cards_to_play[countdown] -= 1
+        won = countdown[self.cards_to_play[countdown] == 0]
+        self.pile_winner[won] = self.played_royal[won]
+        self.next_pile_winner[won] = self.played_royal[won]
+        self.next_player(games[~royal & (self.played_royal[games] < 0)])
+
+    # Move each game's turn to the next active seat, or to the pile winner
+    def next_player(self, games):
+        if not games.size:
+            return
+        P = self.players
+        self.waited_turns[games] = 0
+        winner = self.pile_winner[games]
+        has_winner = winner >= 0
+        self.current[games[has_winner]] = winner[has_winner]
+        games = games[~has_winner]
+        candidates = (self.current[games][:, None] + np.arange(1, P + 1)[None, :]) % P
+        eligible = self.alive[games[:, None], candidates] & ~self.skip[games[:, None], candidates]
+        self.current[games] = candidates[np.arange(len(games)), np.argmax(eligible, axis=1)]
+
+    # Remove players without cards from rotation until the next pile
+    def temp_remove(self, games, seats):
+        if not games.size:
+            return
+        royal = self.played_royal[games] >= 0
+        won = games[royal]
+        self.pile_winner[won] = self.played_royal[won]
+        self.next_pile_winner[won] = self.played_royal[won]
+        games, seats = games[~royal], seats[~royal]
+        self.skip[games, seats] = True
+        self.rotation_changed[games] = True
+        remaining = self.alive[games] & ~self.skip[games]
+        last = remaining.sum(axis=1) == 1
+        # The last player with cards takes the pile
+        last_games = games[last]
+        last_seats = np.argmax(remaining[last], axis=1)
+        self.current[last_games] = last_seats
+        self.take_pile(last_games, last_seats)
+        games, seats = games[~last], seats[~last]
+        self.next_player(games[self.current[games] == seats])
+
+    # Splice the burned cards then the pile under the winner's hand
+    def take_pile(self, games, seats):
+        if not games.size:
+            return
+        burned_n = self.burned_n[games]
+        total = burned_n + self.pile_n[games]
+        # One entry per moved card: its game, seat and position in the burned cards then the pile
+        game_rows = np.repeat(games, total)
+        seat_rows = np.repeat(seats, total)
+        position = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        burned_rows = np.repeat(burned_n, total)
+        cards = np.where(position < burned_rows,
+                         self.burned[game_rows, np.minimum(position, self.deck_size - 1)],
+                         self.pile[game_rows, np.maximum(position - burned_rows, 0)])
+        target = np.repeat(self.head[games, seats] + self.count[games, seats], total) + position
+        self.hands[game_rows, seat_rows, target % self.deck_size] = cards
+        self.count[games, seats] += total
+        self.piles[games] += 1
+        self.next_new_pile[games] = True
+        self.next_movements[games] = False
+        self.reset_pile(games)
+
+    def reset_pile(self, games):
+        self.pile_n[games] = 0
+        self.burned_n[games] = 0
+        self.played_royal[games] = -1
+        self.cards_to_play[games] = 0
+        self.pile_winner[games] = -1
+        self.slapped[games] = -1
+        self.pattern[games] = 0
+        self.rotation_changed[games] |= self.skip[games].any(axis=1)
+        self.skip[games] = False
+        self.waited_turns[games] = 0
+
+    ## Main lockstep loop
+    def tick(self):
+        actions = self.react()
+        # Start the next event
+        self.next_turn[:] = self.current
+        self.next_new_pile[:] = False
+        self.next_pile_winner[:] = -1
+        self.next_movements[:] = False
+        self.card_pushed[:] = False
+        self.resolve(*actions)
+        # Whoever slapped first takes the pile
+        slapped = np.nonzero(self.slapped >= 0)[0]
+        self.current[slapped] = self.slapped[slapped]
+        self.take_pile(slapped, self.current[slapped])
+        # Publish the event for the next tick
+        self.event_turn[:] = self.current
+        self.event_new_pile[:] = self.next_new_pile
+        self.event_pile_winner[:] = self.next_pile_winner
+        self.event_movements[:] = self.next_movements
+        self.event_royal[:] = (self.played_royal >= 0) & ~self.next_new_pile
+        top = self.pile[np.arange(len(self.active)), np.maximum(self.pile_n - 1, 0)]
+        self.memory_top[:] = np.where(self.next_new_pile, -1, np.where(self.card_pushed, top, self.memory_top))
+        self.ticks[self.active] += 1
+
+    # Play a number of games and return the winner (roster index, -1 if stopped by the tick or pile budget),
+    # ticks and seating of each
+    def run(self, games):
+        K = min(self.batch_size, games)
+        self.allocate(K)
+        winners = np.full(games, -1, dtype=np.int64)
+        ticks = np.zeros(games, dtype=np.int64)
+        seating = np.zeros((games, self.players), dtype=np.int64)
+        started = K
+        self.start_games(np.arange(K), np.arange(K))
+        while np.any(self.active):
+            self.tick()
+            alive = self.alive.sum(axis=1)
+            over_budget = (self.ticks >= self.max_ticks) | (self.piles >= self.max_piles)
+            finished = np.nonzero(self.active & ((alive <= 1) | over_budget))[0]
+            if finished.size:
+                numbers = self.game_index[finished]
+                won = alive[finished] == 1
+                winner_seats = np.argmax(self.alive[finished], axis=1)
+                winners[numbers] = np.where(won, self.seating[finished, winner_seats], -1)
+                ticks[numbers] = self.ticks[finished]
+                seating[numbers] = self.seating[finished]
+                self.active[finished] = False
+                # Refill the finished slots with new games
+                refill = finished[:max(0, min(finished.size, games - started))]
+                if refill.size:
+                    self.start_games(refill, np.arange(started, started + refill.size))
+                    started += refill.size
+                elif np.count_nonzero(self.active) * 2 < len(self.active):
+                    self.compact()
+        return winners, ticks, seating
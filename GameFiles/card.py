@@ -1,8 +1,25 @@
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+SUIT_INDEX = {suit: index for index, suit in enumerate(SUITS)}
+
 ## Card representation with rank and suit
+# code is the card's integer 0-51 (suit * 13 + rank index)
 class Card:
+    __slots__ = ("rank", "suit", "rank_index", "code")
+
     def __init__(self,rank,suit):
         self.rank=rank
         self.suit=suit
+        self.rank_index = RANK_INDEX[rank]
+        self.code = SUIT_INDEX[suit] * len(RANKS) + self.rank_index
 
     def __str__(self):
-        return f"{self.rank} of {self.suit}"
\ No newline at end of file
+        return f"{self.rank} of {self.suit}"
+
+# One shared immutable card per code
+CARDS = [Card(rank, suit) for suit in SUITS for rank in RANKS]
+
+# Get the shared card of a code
+def card_from_code(code):
+    return CARDS[code]
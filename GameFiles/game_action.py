@@ -1,4 +1,6 @@
-class GameAction: 
+class GameAction:
+    __slots__ = ("action_type", "player", "time")
+
     def __init__(self, type, player, time):
         self.action_type = type
         self.player = player
@@ -41,4 +43,26 @@ class GameAction:
         return NotImplemented
     
     def __str__(self) -> str:
-        return f"GameAction: player {self.player.name}, action {self.action_type}, time {self.time}"
\ No newline at end of file
+        return f"GameAction: player {self.player.name}, action {self.action_type}, time {self.time}"
+
+## Free list of handled actions, for games in low allocation mode
+# Players take their actions from the pool and the game gives them back once
+# they were resolved, so a long run reuses the same few action objects
+class ActionPool:
+    def __init__(self, size=64):
+        self.size = size
+        self.free = []
+
+    # Same arguments as GameAction
+    def take(self, type, player, time):
+        if self.free:
+            action = self.free.pop()
+            action.action_type = type
+            action.player = player
+            action.time = time
+            return action
+        return GameAction(type, player, time)
+
+    def release(self, actions):
+        if len(self.free) < self.size:
+            self.free.extend(actions)
@@ -1,4 +1,7 @@
 class GameEvent:
+    __slots__ = ("player_turn", "cards", "movements", "new_pile", "start_to_play", "burned", "pile_winner",
+                 "player_rotation", "slappable_pattern", "royal_state")
+
     def __init__(self, player_turn):
         self.player_turn = player_turn
         self.cards = []
@@ -7,4 +10,19 @@ class GameEvent:
         self.start_to_play = []
         self.burned = []
         self.pile_winner = None
-        self.player_rotation = []
\ No newline at end of file
+        self.player_rotation = []
+        # Slap pattern on top of the pile (Double, Marriage, Sandwich, Divorce) or None
+        self.slappable_pattern = None
+        # Cards left to play against the current royal, None if no royal was played on this pile
+        self.royal_state = None
+
+    # Start the next tick's event in place, for games reusing one event
+    # The rotation, slap and royal state are published again by the game
+    def reset(self, player_turn):
+        self.player_turn = player_turn
+        self.cards.clear()
+        self.movements.clear()
+        self.new_pile = None
+        self.start_to_play.clear()
+        self.burned.clear()
+        self.pile_winner = None
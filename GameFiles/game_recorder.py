@@ -0,0 +1,154 @@
+import struct
+import numpy as np
+
+## Compact binary recording of game actions
+# Every record has the same width, so a log can be memory-mapped as a NumPy
+# structured array and scanned without building Python objects per record
+
+# Record types, actions use the same codes as the batch engine
+MOVEMENT, CARD, SLAP, LEAVE, WAIT, FAKE, PILE_TAKE, BURN, GAME_START, GAME_END = range(1, 11)
+ACTION_CODES = {"Movement": MOVEMENT, "Card": CARD, "Slap": SLAP, "Leave": LEAVE, "Wait": WAIT, "Fake": FAKE}
+RECORD_NAMES = {code: name for name, code in ACTION_CODES.items()}
+RECORD_NAMES.update({PILE_TAKE: "PileTake", BURN: "Burn", GAME_START: "GameStart", GAME_END: "GameEnd"})
+
+# type, player id (255 for none), card code (-1 for none), burn reason, card count, time, tick, game number
+RECORD_DTYPE = np.dtype([
+    ("type", "u1"), ("player", "u1"), ("card", "i1"), ("reason", "u1"),
+    ("count", "<u2"), ("time", "<f4"), ("tick", "<u4"), ("game", "<u4"),
+])
+MAGIC = b"ERSLOG1\0"
+# Magic and record size, padded to 16 bytes
+HEADER = struct.Struct("<8sI4x")
+
+class GameRecorder:
+    # names optionally fixes the player id of each player name across games,
+    # otherwise players are numbered by seat
+    def __init__(self, path, names=None, buffer_records=65536):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, RECORD_DTYPE.itemsize))
+        self.names = {name: index for index, name in enumerate(names)} if names else None
+        self.buffer_records = buffer_records
+        self.game = -1
+        self.player_ids = {}
+        # Records are buffered as three plain lists and packed in bulk on flush:
+        # type, player, card, reason and count share one integer
+        self.meta = []
+        self.ticks = []
+        self.times = []
+        # (first buffered record, game number) of each game in the buffer
+        self.segments = []
+
+    # Start recording a new game and number its players
+    def begin_game(self, game):
+        self.game += 1
+        self.segments.append((len(self.meta), self.game))
+        if self.names:
+            ids = [self.names[player.name] for player in game.players]
+        else:
+            ids = list(range(len(game.players)))
+        # Player ids are stored pre-shifted into their field of the meta integer
+        self.player_ids = {player: player_id << 8 for player, player_id in zip(game.players, ids)}
+        for player in game.players:
+            self.write(GAME_START, player, -1, 0, len(player.hand), 0.0, 0)
+
+    def write(self, record_type, player, card, reason, count, time, tick):
+        self.meta.append(record_type | self.player_ids.get(player, 255 << 8) | (card + 1) << 16 | reason << 24 | count << 32)
+        self.ticks.append(tick)
+        self.times.append(time)
+        if len(self.meta) >= self.buffer_records:
+            self.flush()
+
+    def record_action(self, game, action, card=None):
+        self.meta.append(ACTION_CODES[action.action_type] | self.player_ids[action.player]
+                         | (0 if card is None else (card.code + 1) << 16))
+        self.ticks.append(game.ticks)
+        self.times.append(action.time)
+        if len(self.meta) >= self.buffer_records:
+            self.flush()
+
+    def record_burn(self, game, player, card, reason):
+        self.write(BURN, player, -1 if card is None else card.code, reason, 0, 0.0, game.ticks)
+
+    def record_pile_take(self, game, player, count):
+        self.write(PILE_TAKE, player, -1, 0, count, 0.0, game.ticks)
+
+    def end_game(self, game, winner):
+        self.write(GAME_END, winner, -1, 0, len(winner.hand) if winner else 0, 0.0, game.ticks)
+
+    # Pack the buffered records and append them to the log
+    def flush(self):
+        if not self.meta:
+            return
+        meta = np.array(self.meta, dtype=np.int64)
+        records = np.empty(len(meta), dtype=RECORD_DTYPE)
+        records["type"] = meta & 0xFF
+        records["player"] = (meta >> 8) & 0xFF
+        records["card"] = ((meta >> 16) & 0xFF) - 1
+        records["reason"] = (meta >> 24) & 0xFF
+        records["count"] = (meta >> 32) & 0xFFFF
+        records["tick"] = self.ticks
+        records["time"] = self.times
+        starts = [start for start, _ in self.segments] + [len(meta)]
+        records["game"] = np.repeat([game for _, game in self.segments], np.diff(starts))
+        records.tofile(self.file)
+        self.meta.clear()
+        self.ticks.clear()
+        self.times.clear()
+        # The current game continues at the start of the next buffer
+        self.segments = [(0, self.game)]
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+## Memory-mapped reader of a game log
+class GameLog:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            magic, record_size = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a game log")
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size)
+
+    def __len__(self):
+        return len(self.records)
+
+    # Step through the records one at a time
+    def __iter__(self):
+        return iter(self.records)
+
+    # Index of the first record of each game
+    def game_starts(self):
+        games = self.records["game"]
+        return np.flatnonzero(np.r_[True, games[1:] != games[:-1]])
+
+    # Records of a single game as a view into the log
+    def game(self, number):
+        games = self.records["game"]
+        start, stop = np.searchsorted(games, [number, number + 1])
+        return self.records[start:stop]
+
+    # Number of records of each type
+    def type_counts(self):
+        counts = np.bincount(self.records["type"], minlength=len(RECORD_NAMES) + 1)
+        return {RECORD_NAMES[code]: int(counts[code]) for code in RECORD_NAMES}
+
+    # Win count of each player id
+    def wins(self):
+        ends = self.records[self.records["type"] == GAME_END]
+        return np.bincount(ends["player"][ends["player"] != 255])
+
+    # Ticks of each game
+    def game_ticks(self):
+        return self.records["tick"][self.records["type"] == GAME_END]
+
+    # Card count of each pile pickup
+    def pile_sizes(self):
+        return self.records["count"][self.records["type"] == PILE_TAKE]
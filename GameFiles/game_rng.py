@@ -0,0 +1,103 @@
+from collections import deque
+from itertools import chain
+from operator import length_hint
+import numpy as np
+
+## Per-game random streams, seeded from the game seed
+# A game's seed is split into independent NumPy generators for the deal, the
+# players' reactions and the scheduler's tie breaks, so a game replays from its
+# seed alone, whatever else runs in the process. Reactions and tie breaks take
+# one uniform float per draw, which are drawn a block at a time and handed out
+# by a C-level iterator: draw() costs no more than a list lookup
+
+# Uniform floats drawn per block
+BLOCK_SIZE = 512
+
+## Uniform [0, 1) floats of a generator, drawn in blocks
+class UniformStream:
+    def __init__(self, bit_generator, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.generator = np.random.Generator(bit_generator)
+        # Floats of the current block, the iterator reading them and the generator state after them
+        self.values = None
+        self.block = None
+        self.block_end = None
+        # Set when restore replaced the block the chain was reading
+        self.restored = False
+        self.new_block()
+        # Players keep this bound method, so the stream is reset in place and never rebuilt
+        self.draw = chain.from_iterable(self.blocks()).__next__
+
+    def new_block(self):
+        self.values = self.generator.random(self.block_size).tolist()
+        self.block = iter(self.values)
+        self.block_end = self.generator.bit_generator.state
+
+    def blocks(self):
+        while True:
+            yield self.block
+            if self.restored:
+                self.restored = False
+            else:
+                self.new_block()
+
+    # Generator state after the current block, the block and the floats drawn from it.
+    # Blocks are never modified, so the state refers to the block instead of copying it
+    def state(self):
+        return self.block_end, self.values, len(self.values) - length_hint(self.block)
+
+    def restore(self, state):
+        block_end, values, drawn = state
+        self.generator.bit_generator.state = block_end
+        old_block = self.block
+        self.values = values
+        self.block = iter(values)
+        # List iterators restore their position like when unpickled
+        self.block.__setstate__(drawn)
+        self.block_end = block_end
+        self.switch_from(old_block)
+
+    # Start over from a new bit generator
+    def reseed(self, bit_generator):
+        self.generator = np.random.Generator(bit_generator)
+        old_block = self.block
+        self.new_block()
+        self.switch_from(old_block)
+
+    # Exhaust the block being read, so the chain moves on to the new one
+    def switch_from(self, old_block):
+        deque(old_block, maxlen=0)
+        self.restored = True
+
+def bit_generators(seed, count):
+    return [np.random.PCG64(sequence) for sequence in np.random.SeedSequence(seed).spawn(count)]
+
+class GameRng:
+    def __init__(self, seed):
+        deal, players, tiebreaks = bit_generators(seed, 3)
+        # Shuffles of the deck
+        self.deal = np.random.Generator(deal)
+        # Reaction times, jitter and random decisions of every player
+        self.players = UniformStream(players)
+        # Action scheduler tie breaks
+        self.tiebreaks = UniformStream(tiebreaks)
+
+    # Random order of range(count) as a list
+    def permutation(self, count):
+        return self.deal.permutation(count).tolist()
+
+    def state(self):
+        return self.deal.bit_generator.state, self.players.state(), self.tiebreaks.state()
+
+    def restore(self, state):
+        deal, players, tiebreaks = state
+        self.deal.bit_generator.state = deal
+        self.players.restore(players)
+        self.tiebreaks.restore(tiebreaks)
+
+    # Switch every stream to a new seed, e.g. for each rollout of a forked game
+    def reseed(self, seed):
+        deal, players, tiebreaks = bit_generators(seed, 3)
+        self.deal = np.random.Generator(deal)
+        self.players.reseed(players)
+        self.tiebreaks.reseed(tiebreaks)
@@ -0,0 +1,42 @@
+## Compact copy of a game's state, taken by Game.snapshot and applied by Game.restore
+# Players are stored by seat and cards are the shared Card objects, so a
+# snapshot is a few tuples of references and restoring it copies no cards.
+# Seats without a player (no pile winner, no royal) are -1
+class GameSnapshot:
+    __slots__ = ("players", "hands", "pile", "burned", "turn", "played_royal", "cards_to_play", "pile_winner",
+                 "slapped", "slap_pattern", "skip", "counters", "end_reason", "stats", "event", "pending",
+                 "player_states", "rng_state", "sequence")
+
+    def __init__(self, players, hands, pile, burned, turn, played_royal, cards_to_play, pile_winner, slapped,
+                 slap_pattern, skip, counters, end_reason, stats, event, pending, player_states, rng_state, sequence):
+        # Seats still in the game in play order
+        self.players = players
+        # Hand of every seat, including seats that left
+        self.hands = hands
+        self.pile = pile
+        self.burned = burned
+        # Seat whose turn it is
+        self.turn = turn
+        self.played_royal = played_royal
+        self.cards_to_play = cards_to_play
+        self.pile_winner = pile_winner
+        self.slapped = slapped
+        self.slap_pattern = slap_pattern
+        # Seats skipped until the next pile
+        self.skip = skip
+        # (waited_turns, ticks, slaps, burns, fakes, pile_pickups, piles_seen)
+        self.counters = counters
+        self.end_reason = end_reason
+        # GameStats.state of the game's counters
+        self.stats = stats
+        # (turn seat, cards, movement seats, new_pile, pile winner seat, burned) of the event players react to,
+        # None before the game started
+        self.event = event
+        # (time, tiebreak, sequence, seat, action type) of the actions pushed so far this tick
+        self.pending = pending
+        # Player.snapshot_state of every seat
+        self.player_states = player_states
+        # GameRng.state of the game's random streams
+        self.rng_state = rng_state
+        # Action sequence number of the scheduler, None before the game started
+        self.sequence = sequence
@@ -0,0 +1,66 @@
+## Per-game counters kept by the engine as the game is played
+# Every event costs one or two integer increments into fixed-size lists, and
+# the counters are flattened into the game record as plain integer columns, so
+# Simulation.stats_report can sum them over any number of games with NumPy
+
+# Labels Game.is_slappable returns for a correct slap
+SLAP_LABELS = ("Double", "Marriage", "Sandwich", "Divorce", "Royal Win")
+SLAP_INDEX = {label: index for index, label in enumerate(SLAP_LABELS)}
+SLAP_COLUMNS = tuple("slaps_" + label.lower().replace(" ", "_") for label in SLAP_LABELS)
+
+# Burn reasons in the order of the BURN_* codes of ers_game, which start at 1
+BURN_COLUMNS = ("burns_out_of_turn", "burns_miss_slap", "burns_waited")
+
+# Piles picked up by size: up to 1, 2, 3-4, 5-8, ... cards, the last bucket takes every larger pile
+PICKUP_BUCKETS = 8
+PICKUP_COLUMNS = tuple(f"pickups_le_{1 << bucket}" for bucket in range(PICKUP_BUCKETS - 1)) + \
+                 (f"pickups_gt_{1 << (PICKUP_BUCKETS - 2)}",)
+
+STAT_COLUMNS = SLAP_COLUMNS + ("false_slaps",) + BURN_COLUMNS + ("royal_wins", "pickup_cards", "max_pickup") \
+               + PICKUP_COLUMNS
+
+class GameStats:
+    __slots__ = ("slaps", "false_slaps", "burns", "royal_wins", "pickup_cards", "max_pickup", "pickup_sizes")
+
+    def __init__(self):
+        # Correct slaps by SLAP_LABELS index
+        self.slaps = [0] * len(SLAP_LABELS)
+        # Slaps on a pile that was not slappable
+        self.false_slaps = 0
+        # Burned cards by burn reason, index 0 is unused
+        self.burns = [0] * (len(BURN_COLUMNS) + 1)
+        # Royal sequences won by the player who played the royal
+        self.royal_wins = 0
+        # Cards picked up over every pile and in the largest pile
+        self.pickup_cards = 0
+        self.max_pickup = 0
+        # Piles picked up by PICKUP_COLUMNS bucket
+        self.pickup_sizes = [0] * PICKUP_BUCKETS
+
+    def add_pickup(self, size):
+        self.pickup_cards += size
+        if size > self.max_pickup:
+            self.max_pickup = size
+        self.pickup_sizes[min((size - 1).bit_length(), PICKUP_BUCKETS - 1) if size else 0] += 1
+
+    # Counters as record columns
+    def as_dict(self):
+        columns = dict(zip(SLAP_COLUMNS, self.slaps))
+        columns["false_slaps"] = self.false_slaps
+        columns.update(zip(BURN_COLUMNS, self.burns[1:]))
+        columns["royal_wins"] = self.royal_wins
+        columns["pickup_cards"] = self.pickup_cards
+        columns["max_pickup"] = self.max_pickup
+        columns.update(zip(PICKUP_COLUMNS, self.pickup_sizes))
+        return columns
+
+    # Counters for game snapshots
+    def state(self):
+        return (tuple(self.slaps), self.false_slaps, tuple(self.burns), self.royal_wins, self.pickup_cards,
+                self.max_pickup, tuple(self.pickup_sizes))
+
+    def restore(self, state):
+        slaps, self.false_slaps, burns, self.royal_wins, self.pickup_cards, self.max_pickup, pickup_sizes = state
+        self.slaps[:] = slaps
+        self.burns[:] = burns
+        self.pickup_sizes[:] = pickup_sizes
@@ -0,0 +1,87 @@
+import time
+
+## Optional per-phase timing of the game loop
+# Attaching to a game replaces its hot-path methods (and its players'
+# react_to_event) with timed wrappers stored on the instances, so a game without
+# instrumentation runs the plain class methods and pays nothing. Timers are
+# inclusive: take_pile includes the reset_pile it calls, resolve includes slap,
+# card and pile pickups made while handling an action
+
+# Phase name -> Game method timed as that phase
+GAME_PHASES = {
+    "deal": "create_deck",
+    "resolve": "handle_new_action",
+    "card": "handle_new_card",
+    "slap": "handle_slap",
+    "pile_pickup": "take_pile",
+    "pile_reset": "reset_pile",
+    "publish": "publish_event_state",
+}
+
+class Instrumentation:
+    def __init__(self):
+        # Phase -> [calls, seconds]
+        self.phases = {}
+        # Player class name -> [calls, seconds] of react_to_event
+        self.react = {}
+        self.games = 0
+        self.ticks = 0
+
+    # Replace the game's and players' methods with timed wrappers
+    def attach(self, game):
+        for phase, method in GAME_PHASES.items():
+            setattr(game, method, self.timed(self.phases, phase, getattr(game, method)))
+        for player in game.players:
+            player.react_to_event = self.timed(self.react, type(player).__name__, player.react_to_event)
+
+    # Time the action ordering of a game's scheduler
+    def attach_scheduler(self, scheduler):
+        scheduler.drain = self.timed(self.phases, "schedule", scheduler.drain)
+
+    # Count a finished game
+    def end_game(self, game, seconds):
+        self.games += 1
+        self.ticks += game.ticks
+        self.add(self.phases, "game", 1, seconds)
+
+    def timed(self, table, key, method):
+        entry = table.setdefault(key, [0, 0.0])
+        perf_counter = time.perf_counter
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return method(*args)
+            finally:
+                entry[0] += 1
+                entry[1] += perf_counter() - start
+        return wrapper
+
+    def add(self, table, key, calls, seconds):
+        entry = table.setdefault(key, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+    # Merge the counts of another run, e.g. from a worker process
+    def merge(self, other):
+        for key, (calls, seconds) in other.phases.items():
+            self.add(self.phases, key, calls, seconds)
+        for key, (calls, seconds) in other.react.items():
+            self.add(self.react, key, calls, seconds)
+        self.games += other.games
+        self.ticks += other.ticks
+
+    # Plain dictionary of the counters and timers, ready for json.dump
+    def as_dict(self):
+        def export(table):
+            return {key: {"calls": calls, "seconds": seconds} for key, (calls, seconds) in table.items()}
+        return {"games": self.games, "ticks": self.ticks, "phases": export(self.phases), "react": export(self.react)}
+
+    def __str__(self):
+        total = self.phases.get("game", [0, 0.0])[1]
+        lines = [f"{'phase':<28}{'calls':>12}{'seconds':>12}{'us/call':>12}{'share':>8}"]
+        for title, table in (("", self.phases), ("react_to_event: ", self.react)):
+            for key, (calls, seconds) in sorted(table.items(), key=lambda item: -item[1][1]):
+                lines.append(f"{title + key:<28}{calls:>12}{seconds:>12.3f}{seconds / max(calls, 1) * 1e6:>12.2f}"
+                             f"{seconds / total if total else 0.0:>8.1%}")
+        lines.append(f"{self.games} games, {self.ticks} ticks")
+        return "\n".join(lines)
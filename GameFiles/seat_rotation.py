@@ -0,0 +1,49 @@
+## Turn order of a game as a ring of the players in seat order
+# Players still in the game are kept in the game's players list, the ring links
+# the ones currently taking turns. Skipping a player until the next pile unlinks
+# it in O(1) and keeps its link forward, so the next player after a skipped one
+# is found by following links instead of scanning the table. The ring is linked
+# again from the players list when a pile is taken with players skipped
+class SeatRotation:
+    def __init__(self, players):
+        # The game's list of players still in the game, in seat order
+        self.players = players
+        # Next player of every player, kept for unlinked players
+        self.following = {}
+        # Previous player of every linked player
+        self.preceding = {}
+        self.active = 0
+        self.relink(())
+
+    # Link every player in seat order but the skipped ones
+    def relink(self, skipped):
+        active = [player for player in self.players if player not in skipped]
+        self.following.update(zip(active, active[1:] + active[:1]))
+        self.preceding = dict(zip(active, active[-1:] + active[:-1]))
+        self.active = len(active)
+
+    def is_active(self, player):
+        return player in self.preceding
+
+    # First linked player after player in seat order, player may be unlinked
+    def next_active(self, player):
+        player = self.following[player]
+        while player not in self.preceding:
+            player = self.following[player]
+        return player
+
+    # Take a player out of the turns until the ring is linked again, skipping twice does nothing
+    def skip(self, player):
+        if player not in self.preceding:
+            return
+        before = self.preceding.pop(player)
+        self.active -= 1
+        if self.active:
+            after = self.following[player]
+            self.following[before] = after
+            self.preceding[after] = before
+
+    # A player left the game
+    def remove(self, player):
+        self.skip(player)
+        self.players.remove(player)
@@ -0,0 +1,41 @@
+from GameFiles.card import RANKS, RANK_INDEX
+
+## Precomputed lookup tables for slap detection and royal sequences
+# Tables are indexed by rank index so the hot loop never compares rank strings
+
+RANK_COUNT = len(RANKS)
+MARRIAGE_RANKS = {RANK_INDEX['K'], RANK_INDEX['Q']}
+
+# Number of cards the next player has to play after a royal, 0 for other ranks
+ROYAL_CARDS = tuple({'J': 1, 'Q': 2, 'K': 3, 'A': 4}.get(rank, 0) for rank in RANKS)
+
+# Pattern of the top two cards, indexed by top * RANK_COUNT + second
+PAIR_PATTERNS = tuple(
+    "Double" if top == second
+    else "Marriage" if top in MARRIAGE_RANKS and second in MARRIAGE_RANKS
+    else None
+    for top in range(RANK_COUNT) for second in range(RANK_COUNT)
+)
+
+# Pattern of the top card and the card two below it, indexed by top * RANK_COUNT + third
+GAP_PATTERNS = tuple(
+    "Sandwich" if top == third
+    else "Divorce" if top in MARRIAGE_RANKS and third in MARRIAGE_RANKS
+    else None
+    for top in range(RANK_COUNT) for third in range(RANK_COUNT)
+)
+
+# Slap pattern (Double, Marriage, Sandwich, Divorce) at the top of a pile, None if not slappable
+def slap_pattern(cards):
+    size = len(cards)
+    if size < 2:
+        return None
+    top = cards[-1].rank_index * RANK_COUNT
+    pattern = PAIR_PATTERNS[top + cards[-2].rank_index]
+    if pattern is None and size >= 3:
+        pattern = GAP_PATTERNS[top + cards[-3].rank_index]
+    return pattern
+
+# Integer codes of the slap patterns, 0 meaning not slappable
+SLAP_PATTERNS = (None, "Double", "Marriage", "Sandwich", "Divorce")
+SLAP_PATTERN_CODES = {pattern: code for code, pattern in enumerate(SLAP_PATTERNS)}
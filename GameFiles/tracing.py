@@ -0,0 +1,88 @@
+import json
+import sys
+
+## Structured game tracing with levels and sinks
+# The game only calls the tracer when it has one, and passes a message template
+# with its raw arguments (players, cards, counts). Records below the tracer's
+# level are dropped before anything is built, and a message is only formatted
+# when a sink asks for it
+
+DEBUG, INFO, WARNING = 10, 20, 30
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+class TraceRecord:
+    __slots__ = ("level", "event", "tick", "template", "args")
+
+    def __init__(self, level, event, tick, template, args):
+        self.level = level
+        self.event = event
+        self.tick = tick
+        self.template = template
+        self.args = args
+
+    @property
+    def message(self):
+        return self.template.format(*self.args)
+
+class Tracer:
+    def __init__(self, level=INFO, sinks=None):
+        self.level = level
+        self.sinks = [PrintSink()] if sinks is None else sinks
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def emit(self, level, event, tick, template, *args):
+        if level < self.level:
+            return
+        record = TraceRecord(level, event, tick, template, args)
+        for sink in self.sinks:
+            sink.write(record)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+## Sinks receive every record at or above the tracer's level
+
+# Print messages as the game used to
+class PrintSink:
+    def __init__(self, file=None):
+        self.file = file
+
+    def write(self, record):
+        print(record.message, file=self.file or sys.stdout)
+
+    def close(self):
+        pass
+
+# Keep the records in memory
+class ListSink:
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+    def messages(self):
+        return [record.message for record in self.records]
+
+    def close(self):
+        pass
+
+# Write one JSON object per record
+class JsonLinesSink:
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, record):
+        self.file.write(json.dumps({
+            "level": LEVEL_NAMES.get(record.level, record.level),
+            "event": record.event,
+            "tick": record.tick,
+            "message": record.message,
+            "args": [arg if isinstance(arg, (int, float)) else str(arg) for arg in record.args],
+        }) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,29 @@
+from collections import deque
+
+## Fixed-size memory of the last cards a player has seen on the current pile
+# Slap rules only look at the top three cards, so older cards are dropped
+class CardMemory:
+    __slots__ = ("cards", "royal")
+
+    def __init__(self, size=3):
+        self.cards = deque(maxlen=size)
+        # Whether a royal was played on the current pile
+        self.royal = False
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    # Remember newly played cards, pushing out the oldest ones
+    def remember(self, cards):
+        self.cards.extend(cards)
+
+    # Forget everything when a new pile starts
+    def clear(self):
+        self.cards.clear()
+        self.royal = False
@@ -0,0 +1,177 @@
+from GameFiles.card import RANKS, RANK_INDEX
+from Players.player import Player
+
+## Declarative strategies compiled to decision tables
+# A strategy is two ordered rule lists, one deciding whether to slap and one
+# deciding whether to play, evaluated like check_slap_logic and check_play_logic.
+# A rule matches on any of the event features below (unset features match
+# anything) and the first matching rule gives the action, e.g. Preplay is
+#   Strategy(slap=[Rule("slap", slappable=True), Rule("preslap", turn_moving=True, last_rank="J")],
+#            play=[Rule("play", my_turn=True), Rule("play", before_moving=True, royal=False)])
+# Every combination of feature values is evaluated once when a TablePlayer
+# subclass is defined, so a reaction is a table index built from a few
+# attribute checks, with the actions created inline instead of through the
+# check_* / super() chains of the Player subclasses. Players draw their random
+# numbers in the same order as the Player subclasses, so a compiled strategy
+# plays exactly the same seeded games
+
+# Boolean event features and their bit in the table index
+FEATURES = {
+    # The top of the pile is a slap pattern
+    "slappable": 1,
+    # It is this player's turn
+    "my_turn": 2,
+    # The player whose turn it is has started moving
+    "turn_moving": 4,
+    # The player before this one in rotation has started moving
+    "before_moving": 8,
+    # A royal was played on the current pile
+    "royal": 16,
+}
+# The rank of the last card seen ("J", or None for no card) takes the remaining index
+RANK_STRIDE = 32
+TABLE_SIZE = RANK_STRIDE * (len(RANKS) + 1)
+
+# Actions, random_fake fakes or plays depending on the player's fake_threshold
+NO_ACTION, SLAP, PRESLAP, PLAY, FAKE, RANDOM_FAKE, WAIT = range(7)
+ACTIONS = {"slap": SLAP, "preslap": PRESLAP, "play": PLAY, "fake": FAKE, "random_fake": RANDOM_FAKE, "wait": WAIT}
+
+class Rule:
+    def __init__(self, action, last_rank=..., **features):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action}")
+        for feature in features:
+            if feature not in FEATURES:
+                raise ValueError(f"Unknown feature {feature}")
+        if last_rank not in (..., None) and last_rank not in RANK_INDEX:
+            raise ValueError(f"Unknown rank {last_rank}")
+        self.action = ACTIONS[action]
+        self.features = features
+        # ... matches any last card
+        self.last_rank = last_rank
+
+    def matches(self, index):
+        for feature, value in self.features.items():
+            if bool(index & FEATURES[feature]) != value:
+                return False
+        if self.last_rank is ...:
+            return True
+        rank = index // RANK_STRIDE - 1
+        return (rank < 0) if self.last_rank is None else rank == RANK_INDEX[self.last_rank]
+
+class Strategy:
+    def __init__(self, slap=(), play=()):
+        self.slap = list(slap)
+        self.play = list(play)
+
+## Lookup tables of a compiled strategy
+class DecisionTable:
+    def __init__(self, strategy):
+        self.slap = [first_action(strategy.slap, index) for index in range(TABLE_SIZE)]
+        self.play = [first_action(strategy.play, index) for index in range(TABLE_SIZE)]
+        rules = strategy.slap + strategy.play
+        # Features that are only computed when a rule looks at them
+        self.turn_moving = any("turn_moving" in rule.features for rule in rules)
+        self.before_moving = any("before_moving" in rule.features for rule in rules)
+        self.royal = any("royal" in rule.features for rule in rules)
+        self.last_rank = any(rule.last_rank is not ... for rule in rules)
+
+def first_action(rules, index):
+    for rule in rules:
+        if rule.matches(index):
+            return rule.action
+    return NO_ACTION
+
+## Strategies of the existing players
+PLAYER_STRATEGY = Strategy(slap=[Rule("slap", slappable=True)], play=[Rule("play", my_turn=True)])
+NEVER_SLAP_STRATEGY = Strategy(play=[Rule("play", my_turn=True)])
+RANDOM_FAKE_STRATEGY = Strategy(slap=[Rule("slap", slappable=True)], play=[Rule("random_fake", my_turn=True)])
+PREPLAY_STRATEGY = Strategy(
+    slap=[Rule("slap", slappable=True), Rule("preslap", turn_moving=True, last_rank="J")],
+    play=[Rule("play", my_turn=True), Rule("play", before_moving=True, royal=False)],
+)
+
+## Player driven by a compiled strategy, subclasses set strategy
+class TablePlayer(Player):
+    strategy = PLAYER_STRATEGY
+    fake_threshold = .6
+    knobs = Player.knobs + ("fake_threshold",)
+
+    # Compile the strategy once per class
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.table = DecisionTable(cls.strategy)
+
+    # Same flow as Player.react_to_event with the decisions looked up in the table
+    def react_to_event(self, event):
+        if event.new_pile:
+            self.queued_action = None
+            if (len(self.hand) <= 0):
+                return self.new_action("Leave", self, -1)
+            self.can_slap = True
+        # Event memory
+        memory = self.memory
+        memory.remember(event.cards)
+        if (event.royal_state is not None):
+            memory.royal = True
+        if (event.player_rotation is not self.seen_rotation):
+            self.seen_rotation = event.player_rotation
+            self.find_player_before(event.player_rotation)
+        if (event.new_pile):
+            memory.clear()
+        # Queued action from the previous event
+        if self.queued_action:
+            action = self.queued_action
+            self.queued_action = None
+            return action
+        if (event.pile_winner == self):
+            return self.new_action("Slap", self, self.reaction_time + self.reaction_jitter * self.draw())
+
+        table = self.table
+        index = 1 if event.slappable_pattern else 0
+        if event.player_turn == self:
+            index |= 2
+        if table.turn_moving and event.player_turn in event.movements:
+            index |= 4
+        if table.before_moving and self.player_before in event.movements:
+            index |= 8
+        if table.royal and memory.royal:
+            index |= 16
+        if table.last_rank and memory.cards:
+            index += (memory.cards[-1].rank_index + 1) * RANK_STRIDE
+
+        action = table.slap[index]
+        if action:
+            if (len(self.hand) == 0):
+                self.can_slap = False
+            return self.perform(action)
+        if (len(self.hand) > 0):
+            action = table.play[index]
+            if action:
+                return self.perform(action)
+        return self.new_action("Wait", self, self.reaction_time + self.reaction_jitter * self.draw())
+
+    # Create the action, drawing reaction times in the same order as Player
+    def perform(self, action):
+        if action == RANDOM_FAKE:
+            action = FAKE if self.draw() > self.fake_threshold else PLAY
+        if action == SLAP:
+            return self.new_action("Slap", self, self.reaction_time + self.reaction_jitter * self.draw())
+        if action == WAIT:
+            return self.new_action("Wait", self, self.reaction_time + self.reaction_jitter * self.draw())
+        queued = "Slap" if action == PRESLAP else "Card" if action == PLAY else "Fake"
+        self.queued_action = self.new_action(queued, self,
+                                             (self.reaction_time + self.reaction_jitter * self.draw()) / self.prediction_divisor)
+        return self.new_action("Wait" if action == PRESLAP else "Movement", self,
+                               self.reaction_time + self.reaction_jitter * self.draw())
+
+TablePlayer.table = DecisionTable(TablePlayer.strategy)
+
+class TableNeverSlap(TablePlayer):
+    strategy = NEVER_SLAP_STRATEGY
+
+class TableRandomFake(TablePlayer):
+    strategy = RANDOM_FAKE_STRATEGY
+
+class TablePreplay(TablePlayer):
+    strategy = PREPLAY_STRATEGY
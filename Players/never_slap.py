@@ -1,8 +1,8 @@
 from Players.player import Player
 
 class NeverSlap(Player):
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, **knobs):
+        super().__init__(name, **knobs)
     
     def check_slap_logic(self, event):
         return None
\ No newline at end of file
@@ -1,18 +1,69 @@
 import random
+from collections import deque
 from GameFiles.game_event import GameEvent
 from GameFiles.game_action import GameAction
+from Players.card_memory import CardMemory
 
 ## Player representation with name,hand,and play first card
 class Player:
-    def __init__(self,  name):
+    # Number of recent cards kept in memory. Slaps are decided from the event's slap pattern,
+    # so the memory only feeds the last card Preplay looks at and is not a sweepable knob
+    memory_size = 3
+    # Range the base reaction time is drawn from
+    reaction_range = (0.25, 0.3)
+    # Largest random delay added to every reaction
+    reaction_jitter = 0.5
+    # Predicted (queued) actions are this many times faster than reactions
+    prediction_divisor = 4
+    # Class attributes that can be overridden per player, e.g. by a parameter sweep
+    knobs = ("reaction_range", "reaction_jitter", "prediction_divisor")
+
+    def __init__(self,  name, **knobs):
         self.name = name
-        self.hand = []
-        self.reaction_time = random.uniform(0.25,0.3)
+        for knob, value in knobs.items():
+            if knob not in self.knobs:
+                raise ValueError(f"{type(self).__name__} has no knob {knob}")
+            setattr(self, knob, value)
+        self.hand = deque()
+        # Uniform [0, 1) draws, from the game's player stream once the player joined a game
+        self.draw = random.random
+        # Creates the player's actions, from the game's pool in low allocation mode
+        self.new_action = GameAction
+        self.reaction_time = self.draw_reaction_time()
         self.queued_action = None
-        self.memory = []
-        self.royal_sequence = False
+        self.memory = CardMemory(self.memory_size)
         self.can_slap = True
         self.player_before = None
+        # Rotation player_before was computed from
+        self.seen_rotation = None
+
+    # Called by the game when it starts, the player draws from the game's streams from now on
+    # so the game replays from its seed. Players that look at the game keep it
+    def join_game(self, game):
+        self.draw = game.rng.players.draw
+        self.new_action = game.action_pool.take if game.action_pool else GameAction
+        self.reaction_time = self.draw_reaction_time()
+
+    def draw_reaction_time(self):
+        low, high = self.reaction_range
+        return low + (high - low) * self.draw()
+
+    # State the player carries between events, for game snapshots
+    # Queued actions are kept as (type, time), queued callables as they are
+    def snapshot_state(self):
+        queued = self.queued_action
+        if isinstance(queued, GameAction):
+            queued = (queued.action_type, queued.time)
+        return (queued, tuple(self.memory.cards), self.memory.royal, self.can_slap, self.reaction_time)
+
+    def restore_state(self, state):
+        queued, cards, royal, self.can_slap, self.reaction_time = state
+        self.queued_action = self.new_action(queued[0], self, queued[1]) if type(queued) is tuple else queued
+        self.memory.cards.clear()
+        self.memory.cards.extend(cards)
+        self.memory.royal = royal
+        # player_before is found again from the next event's rotation
+        self.seen_rotation = None
 
     # Reaction to game event
     def react_to_event(self, event):
@@ -46,16 +97,29 @@ class Player:
     
     # Default event memory
     def event_memory(self, event : GameEvent):
-        for card in event.cards:
-            self.memory.append(card)
-            if (card.rank in ["J", "Q", "K", "A"]):
-                self.royal_sequence = True
-        for i in range(len(event.player_rotation)):
-            if (event.player_rotation[i] == self):
-                self.player_before = event.player_rotation[i-1]
+        self.memory.remember(event.cards)
+        if (event.royal_state is not None):
+            self.memory.royal = True
+        # The game only builds a new rotation when it changes
+        if (event.player_rotation is not self.seen_rotation):
+            self.seen_rotation = event.player_rotation
+            self.find_player_before(event.player_rotation)
         if (event.new_pile):
-            self.royal_sequence = False
-            self.memory = []
+            self.memory.clear()
+
+    # Find the player right before this one in the rotation
+    def find_player_before(self, rotation):
+        if self in rotation:
+            self.player_before = rotation[rotation.index(self) - 1]
+
+    # Whether a royal was played on the current pile
+    @property
+    def royal_sequence(self):
+        return self.memory.royal
+
+    @royal_sequence.setter
+    def royal_sequence(self, value):
+        self.memory.royal = value
 
     # Tell the player there is a new pile
     def new_pile(self):
@@ -70,32 +134,16 @@ class Player:
 
     # Default slap logic
     def check_slap_logic(self, event):
-        if len(self.memory) >= 2:
-            # Check for double
-            if self.memory[-1].rank == self.memory[-2].rank:
-                return self.slap()
-            
-            # Check for marriage
-            if (self.memory[-1].rank in ['K', 'Q'] and self.memory[-2].rank in ['K', 'Q']) and (self.memory[-1].rank != self.memory[-2].rank):
-                return self.slap()
-
-            if len(self.memory) >= 3:
-                # Check for sandwich
-                if self.memory[-1].rank == self.memory[-3].rank:
-                    return self.slap()
-                
-            if len(self.memory) >= 3:
-                # Check for divorce
-                if self.memory[-1].rank in['K','Q'] and self.memory[-3].rank in ['K','Q']:
-                    return self.slap()
+        if event.slappable_pattern:
+            return self.slap()
         return None
-    
+
     # Get the top card of their hand
     # If they have none return None
     def get_top_card(self):
         if (len(self.hand) <= 0):
             return None
-        return self.hand.pop(0)
+        return self.hand.popleft()
 
     # Default play logic
     def check_play_logic(self, event : GameEvent):
@@ -114,43 +162,43 @@ class Player:
     # Start up playing card action starts movement and queues card
     def play_card(self):
         # Queue card for next event
-        self.queued_action = GameAction("Card", self, self.get_prediction_time())
-        return GameAction("Movement", self, self.get_reaction_time())
+        self.queued_action = self.new_action("Card", self, self.get_prediction_time())
+        return self.new_action("Movement", self, self.get_reaction_time())
     
     def leave_game(self):
-        return GameAction("Leave", self, -1)
+        return self.new_action("Leave", self, -1)
         
     # Start up faking card action starts movement and queues fake
     def fake_card(self):
         # Queue fake for next event
-        self.queued_action = GameAction("Fake", self, self.get_prediction_time())
-        return GameAction("Movement", self, self.get_reaction_time())
+        self.queued_action = self.new_action("Fake", self, self.get_prediction_time())
+        return self.new_action("Movement", self, self.get_reaction_time())
         
     # Slaps the pile on reaction
     def slap(self):
-        return GameAction("Slap", self, self.get_reaction_time())
+        return self.new_action("Slap", self, self.get_reaction_time())
 
     # Will wait this turn and slap fast on next event
     def preslap(self):
-        self.queued_action = GameAction("Slap", self, self.get_prediction_time())
+        self.queued_action = self.new_action("Slap", self, self.get_prediction_time())
         return self.wait()
     
     # Queues both playing card and slap right after
     def play_and_preslap(self):
         def play_and_slap():
-            self.queued_action = GameAction("Slap", self, self.get_prediction_time())
-            return GameAction("Card", self, -random.uniform(0, 1))
+            self.queued_action = self.new_action("Slap", self, self.get_prediction_time())
+            return self.new_action("Card", self, -self.draw())
         self.queued_action = play_and_slap
-        return GameAction("Movement", self, self.get_reaction_time())
+        return self.new_action("Movement", self, self.get_reaction_time())
     
     # Wait for next event
     def wait(self):
-        return GameAction("Wait", self, self.get_reaction_time())
+        return self.new_action("Wait", self, self.get_reaction_time())
     
     # Gets normal reaction time
     def get_reaction_time(self):
-        return self.reaction_time + random.uniform(0, .5)
+        return self.reaction_time + self.reaction_jitter * self.draw()
     
     # Gets predicted reaction time
     def get_prediction_time(self):
-        return self.get_reaction_time() / 4
\ No newline at end of file
+        return self.get_reaction_time() / self.prediction_divisor
\ No newline at end of file
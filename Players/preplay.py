@@ -1,15 +1,18 @@
 from Players.player import Player
+from GameFiles.card import RANK_INDEX
+
+JACK = RANK_INDEX['J']
 
 class Preplay(Player):
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, **knobs):
+        super().__init__(name, **knobs)
 
     def check_slap_logic(self, event):
         default = super().check_slap_logic(event)
         if (default != None):
             return default
         if (len(self.memory) > 0):
-            if (event.player_turn in event.movements and self.memory[-1].rank in ["J"]):
+            if (event.player_turn in event.movements and self.memory[-1].rank_index == JACK):
                 return self.preslap()
     
     def check_play_logic(self, event):
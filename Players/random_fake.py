@@ -1,13 +1,16 @@
 from Players.player import Player
-import random
 
 class RandomFake(Player):
-    def __init__(self, name):
-        super().__init__(name)
+    # Fakes instead of playing when a uniform draw is above this
+    fake_threshold = .6
+    knobs = Player.knobs + ("fake_threshold",)
+
+    def __init__(self, name, **knobs):
+        super().__init__(name, **knobs)
     
     def check_play_logic(self, event):
         if (event.player_turn == self):
-            if (random.uniform(0, 1) > .6):
+            if (self.draw() > self.fake_threshold):
                 return self.fake_card()
             else:
                 return self.play_card()
\ No newline at end of file
@@ -0,0 +1,81 @@
+from Players.player import Player
+
+## Lookahead player choosing its reactions by simulating the game forward
+# When a card was just played, or on its turn, the player snapshots the game
+# and tries each candidate reaction in a number of short rollouts, where the
+# rest of the tick and the following ticks are played out by plain Players.
+# The candidate leaving it with the most cards on average is played. The fork
+# the rollouts run in is made once per game and restored from the snapshot for
+# every rollout. Rollouts draw from the fork's own random streams, so the
+# real game goes on as if they never happened
+
+def react(player, event):
+    return Player.react_to_event(player, event)
+
+def wait(player, event):
+    player.event_memory(event)
+    return player.wait()
+
+def preslap(player, event):
+    player.event_memory(event)
+    return player.preslap()
+
+CANDIDATES = {"react": react, "wait": wait, "preslap": preslap}
+
+class RolloutPlayer(Player):
+    # Rollouts per candidate and ticks played per rollout
+    rollouts = 8
+    horizon = 20
+    knobs = Player.knobs + ("rollouts", "horizon")
+    # Reactions tried, ties go to the first one
+    candidates = ("react", "preslap", "wait")
+
+    def __init__(self, name, **knobs):
+        super().__init__(name, **knobs)
+        self.game = None
+        self.fork = None
+
+    def join_game(self, game):
+        super().join_game(game)
+        self.game = game
+        self.fork = None
+
+    def react_to_event(self, event):
+        # Events without a real choice are played like Player
+        if (self.game is None or event.new_pile or self.queued_action or event.pile_winner == self
+                or not (event.cards or event.player_turn == self)):
+            return super().react_to_event(event)
+        return CANDIDATES[self.choose()](self, event)
+
+    # Name of the candidate with the best rollouts
+    def choose(self):
+        game = self.game
+        snapshot = game.snapshot()
+        if self.fork is None:
+            # Lookahead players are simulated as plain Players so rollouts do not search
+            self.fork = game.fork({seat: Player for seat, player in enumerate(game.seats)
+                                   if isinstance(player, RolloutPlayer)})
+        fork = self.fork
+        seat = game.seat_index[self]
+        # Players after this one have not reacted to this tick yet
+        start = game.players.index(self) + 1
+        # Every candidate is played against the same futures, seeded from the game and decision
+        futures = []
+        for rollout in range(self.rollouts):
+            fork.rng.reseed([game.seed, game.ticks, seat, rollout])
+            futures.append(fork.rng.state())
+        best, best_cards = None, -1
+        for name in self.candidates:
+            candidate = CANDIDATES[name]
+            cards = 0
+            for future in futures:
+                fork.restore(snapshot)
+                fork.rng.restore(future)
+                player = fork.seats[seat]
+                fork.action_scheduler.push(candidate(player, fork.game_event))
+                fork.finish_tick(start)
+                fork.play_until(fork.ticks + self.horizon)
+                cards += len(player.hand)
+            if cards > best_cards:
+                best, best_cards = name, cards
+        return best
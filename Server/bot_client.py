@@ -0,0 +1,88 @@
+import asyncio
+from GameFiles.card import CARDS
+from GameFiles.game_event import GameEvent
+from GameFiles.game_recorder import ACTION_CODES, LEAVE
+from GameFiles.slap_rules import SLAP_PATTERNS
+from Players.player import Player
+from Players.never_slap import NeverSlap
+from Players.random_fake import RandomFake
+from Players.preplay import Preplay
+from Players.decision_table import TablePlayer, TableNeverSlap, TableRandomFake, TablePreplay
+from Server import protocol
+
+## Stand-in bot client playing every seat of its tables with the existing Player classes
+# The events received from the server are rebuilt into GameEvents over the
+# client's own players, so unmodified Player subclasses decide the actions
+
+PLAYER_CLASSES = {player_class.__name__: player_class for player_class in
+                  (Player, NeverSlap, RandomFake, Preplay, TablePlayer, TableNeverSlap, TableRandomFake, TablePreplay)}
+
+class ClientTable:
+    def __init__(self, roster, seating):
+        self.bots = [PLAYER_CLASSES[roster[index][0]](roster[index][1]) for index in seating]
+        self.rotation = []
+        # Seats that left the game
+        self.left = set()
+
+    # Rebuild the server's event over the client's players and collect the reactions
+    def react(self, decoded):
+        _, _, flags, turn, pile_winner, pattern, royal, movements, hand_sizes, card_codes, rotation = decoded
+        bots = self.bots
+        if rotation is not None:
+            self.rotation = [bots[seat] for seat in rotation]
+        event = GameEvent(bots[turn])
+        event.cards = [CARDS[code] for code in card_codes]
+        event.movements = [bot for seat, bot in enumerate(bots) if movements >> seat & 1]
+        event.new_pile = bool(flags & protocol.NEW_PILE)
+        event.pile_winner = bots[pile_winner] if pile_winner >= 0 else None
+        event.player_rotation = self.rotation
+        event.slappable_pattern = SLAP_PATTERNS[pattern]
+        event.royal_state = royal if flags & protocol.ROYAL else None
+        actions = []
+        for seat, bot in enumerate(bots):
+            if seat in self.left:
+                continue
+            # Bots only look at how many cards they hold
+            bot.hand = range(hand_sizes[seat])
+            action = bot.react_to_event(event)
+            code = ACTION_CODES[action.action_type]
+            if code == LEAVE:
+                self.left.add(seat)
+            actions.append((seat, code, action.time))
+        return actions
+
+# Connect to a server, ask for tables playing roster and play them until every game ended
+# Returns the winner names of the finished games
+async def run_client(roster, tables, games_per_table=1, host="127.0.0.1", port=None, path=None):
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(protocol.encode_hello(tables, roster))
+    names = [(player_class.__name__, name) for player_class, name in roster]
+    open_tables = {}
+    winners = []
+    remaining = tables * games_per_table
+    while remaining:
+        message = await protocol.read_frame(reader)
+        if message is None:
+            break
+        message_type, payload = message
+        if message_type == protocol.EVENT:
+            decoded = protocol.decode_event(payload)
+            table_id, tick = decoded[0], decoded[1]
+            writer.write(protocol.encode_actions(table_id, tick, open_tables[table_id].react(decoded)))
+        elif message_type == protocol.TABLE:
+            table_id, seating = protocol.decode_table(payload)
+            open_tables[table_id] = ClientTable(names, seating)
+        elif message_type == protocol.TABLE_END:
+            table_id, winner_seat = protocol.decode_table_end(payload)
+            # A table that failed ends its games left without opening them
+            table = open_tables.pop(table_id, None)
+            winners.append(table.bots[winner_seat].name if table and winner_seat >= 0 else None)
+            remaining -= 1
+        # Let the transport flush once the socket buffer fills up
+        if writer.transport.get_write_buffer_size() > 1 << 16:
+            await writer.drain()
+    writer.close()
+    return winners
@@ -0,0 +1,273 @@
+import asyncio
+import math
+import random
+import struct
+import time
+from GameFiles.ers_game import Game
+from GameFiles.game_action import GameAction
+from GameFiles.game_recorder import ACTION_CODES, CARD, LEAVE, WAIT
+from Players.player import Player
+from Simulation.tournament import game_seed
+from Server import protocol
+
+## Asyncio host of many concurrent game tables
+# A client connection says how many tables it wants for a roster and then
+# plays every seat of those tables. Each tick a table sends its event to the
+# client, waits for the seats' actions until the deadline and resolves them
+# through the same Game steps as play_game. Seats whose actions miss the
+# deadline wait that tick. The server's players only hold the hands, the
+# client's players make the decisions, so every action a client sends is
+# checked before it reaches the game and invalid ones are dropped. A table
+# whose game fails ends its remaining games as stalemates
+
+# Action of each action code a client may send
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+# Bytes buffered on a connection before its tables wait for the client to read, like the bot client
+HIGH_WATER = 1 << 16
+
+## Latency of a table's ticks, from sending the event to receiving the actions
+class TableMetrics:
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.timeouts = 0
+        # Replies to a tick that had already timed out
+        self.late = 0
+        # Actions dropped as invalid and games ended by an error
+        self.invalid = 0
+        self.errors = 0
+
+    def add(self, latency):
+        self.ticks += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def mean_latency(self):
+        return self.total_latency / self.ticks if self.ticks else 0.0
+
+    def as_dict(self):
+        return {"games": self.games, "ticks": self.ticks, "mean_latency": self.mean_latency(),
+                "max_latency": self.max_latency, "timeouts": self.timeouts, "late": self.late,
+                "invalid": self.invalid, "errors": self.errors}
+
+class Table:
+    def __init__(self, table_id, roster, writer):
+        self.id = table_id
+        # (class name, player name) of each roster entry
+        self.roster = roster
+        self.writer = writer
+        self.game = None
+        self.seats = []
+        self.seat_of = {}
+        self.tick = 0
+        self.sent_rotation = None
+        # Future receiving the actions of the current tick
+        self.pending = None
+        self.metrics = TableMetrics()
+        self.winners = []
+        # Exception that ended the table's games early
+        self.error = None
+
+    # Actions received for a tick, dropped if that tick is over
+    def receive(self, tick, actions):
+        if self.pending is None or self.pending.done() or tick != self.tick:
+            self.metrics.late += 1
+            return
+        self.pending.set_result(actions)
+
+# tables is the number of tables the clients will open in all, done is set once
+# they all ended. Without it done is set whenever no table is running
+class GameServer:
+    def __init__(self, games_per_table=1, deadline=1.0, seed=0, tables=None, **game_options):
+        self.games_per_table = games_per_table
+        self.deadline = deadline
+        self.seed = seed
+        self.game_options = game_options
+        self.tables = {}
+        self.expected_tables = tables
+        self.running_tables = 0
+        self.ended_tables = 0
+        self.done = asyncio.Event()
+        # Tasks serving the open client connections
+        self.connections = set()
+        self.start_time = None
+        self.elapsed = 0.0
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        if path:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    # Serve a client: open its tables, then route its actions to them.
+    # A malformed frame ends the connection and the client's tables with it
+    async def handle_client(self, reader, writer):
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        tables = {}
+        tasks = []
+        try:
+            message = await protocol.read_frame(reader)
+            if message is None or message[0] != protocol.HELLO:
+                return
+            count, roster = protocol.decode_hello(message[1])
+            for _ in range(count):
+                table = Table(len(self.tables), roster, writer)
+                self.tables[table.id] = table
+                tables[table.id] = table
+            if self.start_time is None:
+                self.start_time = time.perf_counter()
+            self.running_tables += len(tables)
+            tasks = [asyncio.create_task(self.run_table(table)) for table in tables.values()]
+            while True:
+                message = await protocol.read_frame(reader)
+                if message is None:
+                    break
+                message_type, payload = message
+                if message_type == protocol.ACTIONS:
+                    table_id, tick, actions = protocol.decode_actions(payload)
+                    # Clients only act at their own tables
+                    if table_id in tables:
+                        tables[table_id].receive(tick, actions)
+        except (struct.error, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            self.connections.discard(connection)
+
+    # Deal a seeded game with its seats shuffled like play_seeded_game
+    def new_game(self, table):
+        seed = game_seed(self.seed, table.id * self.games_per_table + table.metrics.games)
+        seating = list(range(len(table.roster)))
+        random.Random(seed).shuffle(seating)
+        table.seats = [Player(table.roster[index][1]) for index in seating]
+        table.seat_of = {player: seat for seat, player in enumerate(table.seats)}
+        table.game = Game(list(table.seats), seed=seed, **self.game_options)
+        table.sent_rotation = None
+        return seating
+
+    async def run_table(self, table):
+        loop = asyncio.get_running_loop()
+        games_left = self.games_per_table
+        try:
+            while games_left:
+                seating = self.new_game(table)
+                await self.send(table, protocol.encode_table(table.id, seating))
+                game = table.game
+                game.start_game()
+                while game.running():
+                    game.ticks += 1
+                    actions = await self.collect_actions(table, loop)
+                    acted = set()
+                    for seat, code, action_time in actions:
+                        player = self.action_player(table, seat, code, action_time, acted)
+                        if player is None:
+                            table.metrics.invalid += 1
+                            continue
+                        game.action_scheduler.push(GameAction(ACTION_NAMES[code], player, action_time))
+                    game.resolve_tick()
+                winner = game.finish_game()
+                games_left -= 1
+                table.metrics.games += 1
+                table.winners.append(winner.name if winner else None)
+                await self.send(table, protocol.encode_table_end(table.id, table.seat_of[winner] if winner else -1))
+        except Exception as error:
+            table.error = error
+            table.metrics.errors += 1
+        finally:
+            # The client still waits for the end of every game the table did not finish
+            if games_left and not table.writer.is_closing():
+                for _ in range(games_left):
+                    table.writer.write(protocol.encode_table_end(table.id, -1))
+            self.running_tables -= 1
+            self.ended_tables += 1
+            if (self.ended_tables == self.expected_tables if self.expected_tables is not None
+                    else self.running_tables == 0):
+                self.elapsed = time.perf_counter() - self.start_time
+                self.done.set()
+
+    # Player of a client's action if the action can be played this tick, None otherwise.
+    # Every seat plays at most one action per tick, like in play_game, so a card
+    # checked here is still in the hand when the action is resolved
+    def action_player(self, table, seat, code, action_time, acted):
+        if seat >= len(table.seats) or seat in acted or code not in ACTION_NAMES or not math.isfinite(action_time):
+            return None
+        player = table.seats[seat]
+        # Cards are played from the hand and players only leave once it is empty, like Player.new_pile
+        if player not in table.game.players or (code == CARD and not player.hand) or (code == LEAVE and player.hand):
+            return None
+        acted.add(seat)
+        return player
+
+    # Send the tick's event and wait for the seats' actions until the deadline
+    async def collect_actions(self, table, loop):
+        game = table.game
+        table.tick = game.ticks
+        rotation = None
+        if game.player_rotation is not table.sent_rotation:
+            table.sent_rotation = game.player_rotation
+            rotation = [table.seat_of[player] for player in game.player_rotation]
+        hand_sizes = [len(player.hand) for player in table.seats]
+        table.pending = loop.create_future()
+        start = time.perf_counter()
+        await self.send(table, protocol.encode_event(table.id, game.ticks, game.game_event, table.seat_of, hand_sizes,
+                                                     rotation))
+        timer = loop.call_later(self.deadline, self.time_out, table.pending)
+        actions = await table.pending
+        timer.cancel()
+        if actions is not None:
+            latency = time.perf_counter() - start
+            table.metrics.add(latency)
+            # On a busy loop the actions can be read after the deadline, before the timer ran
+            if latency > self.deadline:
+                actions = None
+        if actions is None:
+            table.metrics.timeouts += 1
+            # Every seat still playing waits this tick
+            return [(table.seat_of[player], WAIT, self.deadline) for player in game.players]
+        return actions
+
+    # Write a frame to the table's client, waiting for the client to read once too much is buffered
+    async def send(self, table, data):
+        table.writer.write(data)
+        if table.writer.transport.get_write_buffer_size() > HIGH_WATER:
+            await table.writer.drain()
+
+    def time_out(self, pending):
+        if not pending.done():
+            pending.set_result(None)
+
+    # Combined metrics of every table
+    def summary(self):
+        total = TableMetrics()
+        for table in self.tables.values():
+            metrics = table.metrics
+            total.games += metrics.games
+            total.ticks += metrics.ticks
+            total.total_latency += metrics.total_latency
+            total.max_latency = max(total.max_latency, metrics.max_latency)
+            total.timeouts += metrics.timeouts
+            total.late += metrics.late
+            total.invalid += metrics.invalid
+            total.errors += metrics.errors
+        summary = total.as_dict()
+        summary["tables"] = len(self.tables)
+        summary["elapsed"] = self.elapsed
+        summary["ticks_per_sec"] = total.ticks / self.elapsed if self.elapsed else 0.0
+        return summary
+
+    def close(self):
+        self.server.close()
+
+    # Stop listening and wait for the open connections to end, the clients
+    # close theirs once every game they asked for ended
+    async def wait_closed(self):
+        self.close()
+        if self.connections:
+            await asyncio.wait(self.connections)
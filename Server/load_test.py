@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from multiprocessing import Process
+from Simulation.tournament import DEFAULT_ROSTER
+from Server.game_server import GameServer
+from Server.bot_client import run_client
+
+## Load test of the game server against stand-in bot client processes
+#   python -m Server.load_test --tables 2000 --clients 4
+# The server runs in this process and every client process plays its share of
+# the tables over one connection
+
+def client_process(roster, tables, games_per_table, port, path):
+    asyncio.run(run_client(roster, tables, games_per_table, port=port, path=path))
+
+async def serve(args):
+    path = None
+    if args.unix:
+        path = os.path.join(tempfile.mkdtemp(), "ers.sock")
+    server = GameServer(games_per_table=args.games, deadline=args.deadline, seed=args.seed, tables=args.tables)
+    listener = await server.start(port=args.port, path=path)
+    port = None if path else listener.sockets[0].getsockname()[1]
+
+    shares = [args.tables // args.clients + (client < args.tables % args.clients) for client in range(args.clients)]
+    clients = [Process(target=client_process, args=(DEFAULT_ROSTER, share, args.games, port, path))
+               for share in shares if share]
+    for client in clients:
+        client.start()
+    await server.done.wait()
+    # The clients disconnect once their games ended, then exit
+    await server.wait_closed()
+    for client in clients:
+        client.join()
+    return server.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the ERS game server with local bot clients")
+    parser.add_argument("--tables", type=int, default=1000, help="concurrent tables")
+    parser.add_argument("--clients", type=int, default=2, help="bot client processes")
+    parser.add_argument("--games", type=int, default=1, help="games per table")
+    parser.add_argument("--deadline", type=float, default=1.0, help="seconds the server waits for a tick's actions")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the deals")
+    parser.add_argument("--port", type=int, default=0, help="TCP port (default: any free port)")
+    parser.add_argument("--unix", action="store_true", help="use a Unix socket instead of TCP")
+    parser.add_argument("--json", action="store_true", help="print the metrics as JSON")
+    args = parser.parse_args()
+
+    summary = asyncio.run(serve(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{summary['tables']} tables, {summary['games']} games, {summary['ticks']} ticks in {summary['elapsed']:.2f}s "
+          f"({summary['ticks_per_sec']:.0f} ticks/sec)")
+    print(f"tick latency: mean {summary['mean_latency'] * 1e3:.2f} ms, max {summary['max_latency'] * 1e3:.2f} ms, "
+          f"{summary['timeouts']} timeouts, {summary['late']} late replies")
+    print(f"{summary['invalid']} invalid actions dropped, {summary['errors']} tables ended by errors")
+
+if __name__ == "__main__":
+    main()
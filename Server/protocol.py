@@ -0,0 +1,121 @@
+import struct
+from GameFiles.slap_rules import SLAP_PATTERN_CODES
+
+## Binary wire format between the game server and bot clients
+# Every frame is a 4-byte payload length, a 1-byte message type and the payload.
+# Players are referred to by seat index, cards by their code (0-51) and actions
+# by the recorder's action codes, so a whole event fits in a few dozen bytes
+
+FRAME = struct.Struct("<IB")
+
+# Client -> server: open tables for a roster
+HELLO = 1
+# Server -> client: a new game with its seating
+TABLE = 2
+# Server -> client: the event of a tick
+EVENT = 3
+# Client -> server: the actions of the client's seats for a tick
+ACTIONS = 4
+# Server -> client: a table's game ended
+TABLE_END = 5
+
+# Table count, followed by the roster as "Class:Name,Class:Name" text
+HELLO_HEADER = struct.Struct("<I")
+# Table id and seat count, followed by the roster index of each seat
+TABLE_HEADER = struct.Struct("<IB")
+# Table id, tick, flags, turn seat, pile winner seat (-1 for none), slap pattern code,
+# cards left to play against the royal, card count and seat count, followed by each
+# seat's hand size (2 bytes), the movement seat bitmask (one bit per seat), the card
+# codes and the rotation when flagged
+EVENT_HEADER = struct.Struct("<IIBbbBBBB")
+NEW_PILE, ROTATION, ROYAL = 1, 2, 4
+# Table id, tick and action count, followed by the actions
+ACTIONS_HEADER = struct.Struct("<IIB")
+# Seat, action code and time
+ACTION = struct.Struct("<BBf")
+# Table id and winner seat (-1 for a stalemate)
+TABLE_END_BODY = struct.Struct("<Ib")
+
+def frame(message_type, payload):
+    return FRAME.pack(len(payload), message_type) + payload
+
+def encode_hello(tables, roster):
+    text = ",".join(f"{player_class.__name__}:{name}" for player_class, name in roster)
+    return frame(HELLO, HELLO_HEADER.pack(tables) + text.encode())
+
+def decode_hello(payload):
+    (tables,) = HELLO_HEADER.unpack_from(payload)
+    entries = payload[HELLO_HEADER.size:].decode().split(",")
+    return tables, [tuple(entry.split(":", 1)) for entry in entries]
+
+def encode_table(table_id, seating):
+    return frame(TABLE, TABLE_HEADER.pack(table_id, len(seating)) + bytes(seating))
+
+def decode_table(payload):
+    table_id, seats = TABLE_HEADER.unpack_from(payload)
+    return table_id, list(payload[TABLE_HEADER.size:TABLE_HEADER.size + seats])
+
+# Bytes of a bitmask with one bit per seat
+def mask_size(seats):
+    return (seats + 7) // 8
+
+# Encode the game event of a table, seat_of maps the game's players to their seats
+def encode_event(table_id, tick, event, seat_of, hand_sizes, rotation=None):
+    flags = NEW_PILE if event.new_pile else 0
+    royal = 0
+    if event.royal_state is not None:
+        flags |= ROYAL
+        # Cards played after the sequence was won count below zero in the game
+        royal = max(event.royal_state, 0)
+    movements = 0
+    for player in event.movements:
+        movements |= 1 << seat_of[player]
+    pile_winner = seat_of[event.pile_winner] if event.pile_winner else -1
+    body = [EVENT_HEADER.pack(table_id, tick, flags | (ROTATION if rotation is not None else 0),
+                              seat_of[event.player_turn], pile_winner, SLAP_PATTERN_CODES[event.slappable_pattern],
+                              royal, len(event.cards), len(hand_sizes)),
+            struct.pack(f"<{len(hand_sizes)}H", *hand_sizes), movements.to_bytes(mask_size(len(hand_sizes)), "little"),
+            bytes(card.code for card in event.cards)]
+    if rotation is not None:
+        body.append(bytes([len(rotation)]) + bytes(rotation))
+    return frame(EVENT, b"".join(body))
+
+# Decode an event into (table id, tick, flags, turn, pile winner, pattern code, royal, movement bitmask,
+# hand sizes, card codes, rotation seats or None)
+def decode_event(payload):
+    table_id, tick, flags, turn, pile_winner, pattern, royal, cards, seats = EVENT_HEADER.unpack_from(payload)
+    offset = EVENT_HEADER.size
+    hand_sizes = struct.unpack_from(f"<{seats}H", payload, offset)
+    offset += 2 * seats
+    movements = int.from_bytes(payload[offset:offset + mask_size(seats)], "little")
+    offset += mask_size(seats)
+    card_codes = payload[offset:offset + cards]
+    offset += cards
+    rotation = None
+    if flags & ROTATION:
+        rotation = list(payload[offset + 1:offset + 1 + payload[offset]])
+    return table_id, tick, flags, turn, pile_winner, pattern, royal, movements, hand_sizes, card_codes, rotation
+
+# actions are (seat, action code, time) triples
+def encode_actions(table_id, tick, actions):
+    return frame(ACTIONS, ACTIONS_HEADER.pack(table_id, tick, len(actions))
+                 + b"".join(ACTION.pack(*action) for action in actions))
+
+def decode_actions(payload):
+    table_id, tick, count = ACTIONS_HEADER.unpack_from(payload)
+    return table_id, tick, [ACTION.unpack_from(payload, ACTIONS_HEADER.size + i * ACTION.size) for i in range(count)]
+
+def encode_table_end(table_id, winner_seat):
+    return frame(TABLE_END, TABLE_END_BODY.pack(table_id, winner_seat))
+
+def decode_table_end(payload):
+    return TABLE_END_BODY.unpack(payload)
+
+# Read one frame from an asyncio stream, None at the end of the stream
+async def read_frame(reader):
+    try:
+        header = await reader.readexactly(FRAME.size)
+        length, message_type = FRAME.unpack(header)
+        return message_type, await reader.readexactly(length)
+    except EOFError:
+        return None
@@ -0,0 +1,133 @@
+import math
+import time
+from multiprocessing import Pool, cpu_count
+from scipy.stats import beta, binomtest
+from Simulation.tournament import DEFAULT_ROSTER, TournamentResult, game_seed, make_chunks, play_chunk, run_batch_tournament
+
+## Adaptive tournaments that stop once the answer is known
+# Games are played in looks whose size doubles, starting at first_look games.
+# After every look the players are ranked by wins and each adjacent pair is
+# tested with an exact binomial test on the games either of them won. Pairs
+# that may never differ, such as two seats of the same strategy, are settled
+# once the exact interval of their win-rate difference is within tolerance.
+# The tournament stops when every adjacent pair differs or is settled as a
+# tie (or, with precision, when every win-rate interval is narrow enough) or
+# when max_games is reached.
+# The error rate is split evenly over the possible looks and the players
+# (Bonferroni), which the doubling keeps to a handful of looks
+
+class AdaptiveResult:
+    def __init__(self, result, confidence):
+        self.result = result
+        self.confidence = confidence
+        self.looks = 0
+        # "ranking", "precision" or "max_games"
+        self.stopped = None
+        # name -> (low, high) win-rate interval
+        self.intervals = {}
+        # Names from most to fewest wins
+        self.ranking = []
+        # (better, worse, p-value, (low, high) win-rate difference interval) of each adjacent pair of the ranking
+        self.pairs = []
+        # Largest win-rate difference of a pair settled as a tie
+        self.tolerance = None
+
+    def __str__(self):
+        result = self.result
+        lines = [f"{'player':<12}{'wins':>8}{'win rate':>10}{'interval':>20}"]
+        for name in self.ranking:
+            low, high = self.intervals[name]
+            lines.append(f"{name:<12}{result.wins[name]:>8}{result.wins[name] / max(result.games, 1):>10.3f}"
+                         f"{f'[{low:.3f}, {high:.3f}]':>20}")
+        for better, worse, p_value, (low, high) in self.pairs:
+            tie = " (tie)" if self.tolerance is not None and -self.tolerance <= low and high <= self.tolerance else ""
+            lines.append(f"{better} > {worse}: p = {p_value:.4g}, difference in [{low:+.3f}, {high:+.3f}]{tie}")
+        if result.unfinished:
+            reasons = ", ".join(f"{count} {reason}" for reason, count in result.stalemates.items())
+            lines.append(f"{result.unfinished} games stopped as stalemates ({reasons})")
+        lines.append(f"Stopped on {self.stopped} after {result.games} games in {self.looks} looks "
+                     f"at {self.confidence:.0%} confidence ({result.elapsed:.2f}s, {result.games_per_sec():.1f} games/sec)")
+        return "\n".join(lines)
+
+# Exact (Clopper-Pearson) interval of a win rate
+def win_rate_interval(wins, games, alpha):
+    if games == 0:
+        return 0.0, 1.0
+    low = beta.ppf(alpha / 2, wins, games - wins + 1) if wins > 0 else 0.0
+    high = beta.ppf(1 - alpha / 2, wins + 1, games - wins) if wins < games else 1.0
+    return float(low), float(high)
+
+# Exact interval of the win-rate difference of two players over games, from the
+# interval of the share of the games either of them won that went to the first
+def difference_interval(wins, other_wins, games, alpha):
+    decided = wins + other_wins
+    if games == 0:
+        return -1.0, 1.0
+    low, high = win_rate_interval(wins, decided, alpha)
+    return decided / games * (2 * low - 1), decided / games * (2 * high - 1)
+
+# Rank the players and test every adjacent pair of the ranking, alpha is the error rate of each pair's interval
+def rank_players(wins, games, alpha):
+    ranking = sorted(wins, key=lambda name: -wins[name])
+    pairs = []
+    for better, worse in zip(ranking, ranking[1:]):
+        decided = wins[better] + wins[worse]
+        p_value = binomtest(wins[better], decided, 0.5).pvalue if decided else 1.0
+        pairs.append((better, worse, p_value, difference_interval(wins[better], wins[worse], games, alpha)))
+    return ranking, pairs
+
+# tolerance is the largest win-rate difference of two players that still counts as a tie
+# game_options are passed on to every Game, or to every BatchEngine with the batch engine
+def run_adaptive_tournament(roster=DEFAULT_ROSTER, confidence=0.95, first_look=200, max_games=100000, precision=None,
+                            tolerance=0.02, seed=0, workers=None, engine="game", **game_options):
+    if workers is None:
+        workers = cpu_count()
+    workers = max(1, workers)
+    names = [name for _, name in roster]
+    # Number of looks the doubling can take before max_games
+    max_looks = max(1, math.ceil(math.log2(max(max_games / first_look, 1))) + 1)
+    look_alpha = (1 - confidence) / max_looks
+    pair_alpha = look_alpha / max(len(names) - 1, 1)
+
+    result = TournamentResult(names)
+    result.workers = workers
+    adaptive = AdaptiveResult(result, confidence)
+    adaptive.tolerance = tolerance
+    pool = Pool(workers) if engine == "game" and workers > 1 else None
+    start_time = time.perf_counter()
+    try:
+        played = 0
+        while played < max_games:
+            look = min(max(first_look, played), max_games - played)
+            if engine == "batch":
+                result.merge(run_batch_tournament(look, roster, seed=game_seed(seed, adaptive.looks), workers=workers,
+                                                  **game_options))
+            else:
+                tasks = [(roster, seed, range(played + start, played + stop), False, False, game_options)
+                         for start, stop in make_chunks(look, workers)]
+                chunks = pool.imap_unordered(play_chunk, tasks) if pool else map(play_chunk, tasks)
+                for partial, _ in chunks:
+                    result.merge(partial)
+            played += look
+            adaptive.looks += 1
+
+            adaptive.ranking, adaptive.pairs = rank_players(result.wins, result.games, pair_alpha)
+            interval_alpha = look_alpha / len(names)
+            adaptive.intervals = {name: win_rate_interval(result.wins[name], result.games, interval_alpha)
+                                  for name in names}
+            if precision is not None:
+                if all(high - low <= 2 * precision for low, high in adaptive.intervals.values()):
+                    adaptive.stopped = "precision"
+                    break
+            elif all(p_value < pair_alpha or -tolerance <= low and high <= tolerance
+                     for _, _, p_value, (low, high) in adaptive.pairs):
+                adaptive.stopped = "ranking"
+                break
+        else:
+            adaptive.stopped = "max_games"
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    result.elapsed = time.perf_counter() - start_time
+    return adaptive
@@ -0,0 +1,40 @@
+from scipy.stats import chi2_contingency
+from Simulation.tournament import DEFAULT_ROSTER, run_batch_tournament, run_tournament
+
+## Validation of the batch engine against the reference Game engine
+# Both engines play the same roster and their win counts are compared with a
+# chi-square test of homogeneity. A small p-value means the distributions differ.
+# Players that won no game under either engine are left out of the test, with
+# fewer than two players left there is no difference to test and p_value is None
+
+def validate_batch_engine(games, roster=DEFAULT_ROSTER, seed=0, workers=None, batch_size=8192):
+    reference = run_tournament(games, roster, seed=seed, workers=workers)
+    batch = run_batch_tournament(games, roster, seed=seed, workers=workers, batch_size=batch_size)
+    names = [name for _, name in roster]
+    tested = [name for name in names if reference.wins[name] or batch.wins[name]]
+    p_value = None
+    if len(tested) >= 2:
+        table = [[reference.wins[name] for name in tested], [batch.wins[name] for name in tested]]
+        _, p_value, _, _ = chi2_contingency(table)
+    return {
+        "names": names,
+        "reference": reference,
+        "batch": batch,
+        "p_value": p_value,
+    }
+
+# Format a validation result as a comparison table
+def format_validation(validation):
+    reference = validation["reference"]
+    batch = validation["batch"]
+    lines = [f"{'player':<12}{'reference':>12}{'batch':>12}"]
+    for name in validation["names"]:
+        lines.append(f"{name:<12}{reference.wins[name] / max(reference.games, 1):>12.3f}"
+                     f"{batch.wins[name] / max(batch.games, 1):>12.3f}")
+    lines.append(f"{'ticks/game':<12}{reference.mean_ticks():>12.1f}{batch.mean_ticks():>12.1f}")
+    lines.append(f"{'games/sec':<12}{reference.games_per_sec():>12.1f}{batch.games_per_sec():>12.1f}")
+    if validation["p_value"] is None:
+        lines.append("chi-square p-value: no difference testable")
+    else:
+        lines.append(f"chi-square p-value: {validation['p_value']:.4f}")
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+import types
+from GameFiles import ers_game
+from Simulation import tournament
+
+## Persistent content-addressed cache of finished games
+# Every game record is stored under a hash of everything that decides its
+# outcome: the engine version, the roster with the source of each player class,
+# the knobs and game options, and the game seed. The engine version and class
+# sources hash the source files of the modules involved and of every project
+# module they import, so editing Game or a Player subclass changes the keys and
+# the stale entries are never looked up again; they age out through the LRU
+# eviction that keeps the database under max_bytes
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project modules a module depends on, itself included
+def project_modules(module, found=None):
+    if found is None:
+        found = {}
+    path = getattr(module, "__file__", None)
+    if module.__name__ in found or not path or not os.path.abspath(path).startswith(PROJECT_ROOT):
+        return found
+    found[module.__name__] = module
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            project_modules(value, found)
+        elif getattr(value, "__module__", None) in sys.modules:
+            project_modules(sys.modules[value.__module__], found)
+    return found
+
+# Hash of the source files of the modules and their project dependencies
+def source_fingerprint(modules):
+    found = {}
+    for module in modules:
+        project_modules(module, found)
+    digest = hashlib.sha256()
+    for name in sorted(found):
+        digest.update(name.encode())
+        digest.update(inspect.getsource(found[name]).encode())
+    return digest.hexdigest()
+
+# The game engine and the way a seeded game is set up
+ENGINE_VERSION = hashlib.sha256((source_fingerprint([ers_game])
+                                 + inspect.getsource(tournament.play_seeded_game)
+                                 + inspect.getsource(tournament.build_players)).encode()).hexdigest()
+
+_class_fingerprints = {}
+
+def class_fingerprint(player_class):
+    if player_class not in _class_fingerprints:
+        modules = [sys.modules[cls.__module__] for cls in player_class.__mro__ if cls is not object]
+        _class_fingerprints[player_class] = source_fingerprint(modules)
+    return _class_fingerprints[player_class]
+
+# Game options that do not change the outcome of a game
+UNKEYED_OPTIONS = {"debug", "low_alloc"}
+
+# Key of everything shared by the games of a tournament, only the seed is added per game
+def roster_key(roster, knobs=None, game_options=None):
+    game_options = {option: value for option, value in (game_options or {}).items() if option not in UNKEYED_OPTIONS}
+    return json.dumps({
+        "engine": ENGINE_VERSION,
+        "roster": [[player_class.__qualname__, class_fingerprint(player_class), name] for player_class, name in roster],
+        "knobs": sorted([player_class.__qualname__, class_fingerprint(player_class), values]
+                        for player_class, values in (knobs or {}).items()),
+        "options": game_options,
+    }, sort_keys=True)
+
+def game_key(base_key, seed):
+    return hashlib.sha256(f"{base_key}/{seed}".encode()).hexdigest()
+
+class ResultCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS games "
+                                "(key TEXT PRIMARY KEY, record TEXT NOT NULL, size INTEGER NOT NULL, "
+                                "last_used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS games_last_used ON games (last_used)")
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM games").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    # Cached records of a tournament's games by seed
+    def lookup(self, roster, seeds, knobs=None, game_options=None):
+        base_key = roster_key(roster, knobs, game_options)
+        keys = {game_key(base_key, seed): seed for seed in seeds}
+        return {keys[key]: record for key, record in self.get_many(keys).items()}
+
+    # Store the records of a tournament's games
+    def store(self, roster, records, knobs=None, game_options=None):
+        base_key = roster_key(roster, knobs, game_options)
+        self.put_many((game_key(base_key, record["seed"]), record) for record in records)
+
+    # Records of the cached keys, marking them as recently used
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        # Stay below SQLite's limit of bound parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, record FROM games WHERE key IN ({','.join('?' * len(batch))})", batch).fetchall()
+            found.update((key, json.loads(record)) for key, record in rows)
+        now = time.time_ns()
+        with self.connection:
+            self.connection.executemany("UPDATE games SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    # Store records given as (key, record) pairs and evict the least recently used past the size limit
+    def put_many(self, items):
+        now = time.time_ns()
+        rows = []
+        for key, record in items:
+            text = json.dumps(record)
+            rows.append((key, text, len(text), now))
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?)", rows)
+        self.total_bytes += sum(row[2] for row in rows)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    # Drop the least recently used entries until the cache is 90% full
+    def evict(self):
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM games").fetchone()[0]
+        target = self.max_bytes * 0.9
+        if self.total_bytes <= self.max_bytes:
+            return
+        with self.connection:
+            rows = self.connection.execute("SELECT key, size FROM games ORDER BY last_used").fetchall()
+            evicted = []
+            for key, size in rows:
+                if self.total_bytes <= target:
+                    break
+                evicted.append((key,))
+                self.total_bytes -= size
+            self.connection.executemany("DELETE FROM games WHERE key = ?", evicted)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,86 @@
+import os
+import pandas as pd
+from GameFiles.game_stats import STAT_COLUMNS
+
+## Streaming sink of per-game records
+# Records are buffered in column lists and written in fixed-size chunks, so memory
+# stays bounded however many games are played. Parquet files get one row group
+# per chunk and need pyarrow; any other path is written as chunked CSV
+
+COLUMNS = ["seed", "seating", "winner", "end_reason", "ticks", "slaps", "burns", "fakes", "pile_pickups", *STAT_COLUMNS]
+SEATING_SEPARATOR = "|"
+# Nullable text columns, every other column is an integer counter. Parquet chunks are
+# written with this fixed schema, a chunk of stalemates alone would infer a null winner column
+TEXT_COLUMNS = {"seating", "winner", "end_reason"}
+
+class ResultsSink:
+    def __init__(self, path, chunk_size=10000, columns=COLUMNS):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.columns = list(columns)
+        self.parquet = path.endswith(".parquet")
+        self.buffer = {column: [] for column in self.columns}
+        self.buffered = 0
+        self.written = 0
+        self.writer = None
+        if self.parquet:
+            # Imported here so CSV output works without pyarrow
+            import pyarrow
+            import pyarrow.parquet
+            self.pyarrow = pyarrow
+            self.schema = pyarrow.schema([(column, pyarrow.string() if column in TEXT_COLUMNS else pyarrow.int64())
+                                          for column in self.columns])
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def add_record(self, record):
+        for column in self.columns:
+            value = record[column]
+            if column == "seating":
+                value = SEATING_SEPARATOR.join(value)
+            self.buffer[column].append(value)
+        self.buffered += 1
+        if self.buffered >= self.chunk_size:
+            self.flush()
+
+    def add_records(self, records):
+        for record in records:
+            self.add_record(record)
+
+    # Append the buffered records to the file
+    def flush(self):
+        if not self.buffered:
+            return
+        if self.parquet:
+            table = self.pyarrow.Table.from_pydict(self.buffer, schema=self.schema)
+            if self.writer is None:
+                self.writer = self.pyarrow.parquet.ParquetWriter(self.path, self.schema)
+            self.writer.write_table(table)
+        else:
+            pd.DataFrame(self.buffer, columns=self.columns).to_csv(
+                self.path, mode="a", header=self.written == 0, index=False)
+        self.written += self.buffered
+        self.buffer = {column: [] for column in self.columns}
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Load the records of a results file, reading only the requested columns
+def load_results(path, columns=None):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+# Split the seating column back into one column per seat
+def split_seating(results):
+    return results["seating"].str.split(SEATING_SEPARATOR, expand=True).add_prefix("seat_")
@@ -0,0 +1,185 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from GameFiles.game_stats import BURN_COLUMNS, PICKUP_COLUMNS, SLAP_COLUMNS, SLAP_LABELS
+
+## Aggregate report of the per-game statistics of many games
+# A StatsSummary sums the integer columns of game records a frame at a time
+# with NumPy, so a results file of millions of games is summarised chunk by
+# chunk in bounded memory, and summaries of separate runs merge like
+# TournamentResults, e.g.
+#   python -m Simulation.stats_report results.parquet --plot report.png
+
+# Columns summed over every game
+SUM_COLUMNS = ["ticks", "slaps", "burns", "fakes", "pile_pickups", *SLAP_COLUMNS, "false_slaps", *BURN_COLUMNS,
+               "royal_wins", "pickup_cards", *PICKUP_COLUMNS]
+SUM_INDEX = {column: index for index, column in enumerate(SUM_COLUMNS)}
+# Every column a summary reads
+REPORT_COLUMNS = ["winner", "end_reason", "max_pickup", *SUM_COLUMNS]
+# Games by length: up to 1, 2, 3-4, 5-8, ... ticks
+TICK_BUCKETS = 24
+
+class StatsSummary:
+    def __init__(self):
+        self.games = 0
+        self.totals = np.zeros(len(SUM_COLUMNS), dtype=np.int64)
+        self.max_pickup = 0
+        self.min_ticks = None
+        self.max_ticks = 0
+        self.tick_squares = 0.0
+        self.tick_buckets = np.zeros(TICK_BUCKETS, dtype=np.int64)
+        # Games won per player and games ended per reason
+        self.wins = {}
+        self.end_reasons = {}
+
+    # Add the games of a frame of records
+    def add_frame(self, frame):
+        if not len(frame):
+            return
+        self.games += len(frame)
+        self.totals += frame[SUM_COLUMNS].to_numpy(dtype=np.int64).sum(axis=0)
+        self.max_pickup = max(self.max_pickup, int(frame["max_pickup"].max()))
+        ticks = frame["ticks"].to_numpy(dtype=np.int64)
+        low, high = int(ticks.min()), int(ticks.max())
+        self.min_ticks = low if self.min_ticks is None else min(self.min_ticks, low)
+        self.max_ticks = max(self.max_ticks, high)
+        self.tick_squares += float(np.square(ticks, dtype=np.float64).sum())
+        buckets = np.ceil(np.log2(np.maximum(ticks, 1))).astype(np.int64)
+        self.tick_buckets += np.bincount(np.minimum(buckets, TICK_BUCKETS - 1), minlength=TICK_BUCKETS)
+        add_counts(self.wins, frame["winner"].value_counts())
+        add_counts(self.end_reasons, frame["end_reason"].value_counts())
+
+    # Add game records as returned by play_seeded_game
+    def add_records(self, records):
+        self.add_frame(pd.DataFrame.from_records(records, columns=REPORT_COLUMNS))
+
+    def merge(self, other):
+        self.games += other.games
+        self.totals += other.totals
+        self.max_pickup = max(self.max_pickup, other.max_pickup)
+        if other.min_ticks is not None:
+            self.min_ticks = other.min_ticks if self.min_ticks is None else min(self.min_ticks, other.min_ticks)
+        self.max_ticks = max(self.max_ticks, other.max_ticks)
+        self.tick_squares += other.tick_squares
+        self.tick_buckets += other.tick_buckets
+        add_counts(self.wins, other.wins)
+        add_counts(self.end_reasons, other.end_reasons)
+
+    def total(self, column):
+        return int(self.totals[SUM_INDEX[column]])
+
+    # Mean of a column per game
+    def per_game(self, column):
+        return self.total(column) / self.games if self.games else 0.0
+
+    def std_ticks(self):
+        if not self.games:
+            return 0.0
+        mean = self.per_game("ticks")
+        return max(self.tick_squares / self.games - mean * mean, 0.0) ** 0.5
+
+    # Share of each entry of a group of columns in the group's total
+    def shares(self, columns, labels=None):
+        counts = [self.total(column) for column in columns]
+        total = sum(counts) or 1
+        return {label: count / total for label, count in zip(labels or columns, counts)}
+
+    def as_dict(self):
+        slaps = self.total("slaps")
+        return {
+            "games": self.games,
+            "wins": dict(self.wins),
+            "end_reasons": dict(self.end_reasons),
+            "mean_ticks": self.per_game("ticks"),
+            "std_ticks": self.std_ticks(),
+            "min_ticks": self.min_ticks,
+            "max_ticks": self.max_ticks,
+            "tick_buckets": self.tick_buckets.tolist(),
+            "slaps_per_game": self.per_game("slaps"),
+            "slap_patterns": self.shares(SLAP_COLUMNS, SLAP_LABELS),
+            "false_slap_rate": self.total("false_slaps") / slaps if slaps else 0.0,
+            "burns_per_game": self.per_game("burns"),
+            "burn_reasons": self.shares(BURN_COLUMNS),
+            "fakes_per_game": self.per_game("fakes"),
+            "royal_wins_per_game": self.per_game("royal_wins"),
+            "pickups_per_game": self.per_game("pile_pickups"),
+            "mean_pickup": self.total("pickup_cards") / max(self.total("pile_pickups"), 1),
+            "max_pickup": self.max_pickup,
+            "pickup_sizes": {column: self.total(column) for column in PICKUP_COLUMNS},
+        }
+
+    def __str__(self):
+        report = self.as_dict()
+        lines = [f"{self.games} games, {report['mean_ticks']:.1f} +/- {report['std_ticks']:.1f} ticks/game "
+                 f"(min {self.min_ticks}, max {self.max_ticks})"]
+        lines.append("wins: " + ", ".join(f"{name} {wins}" for name, wins in self.wins.items()))
+        lines.append("end reasons: " + ", ".join(f"{reason} {count}" for reason, count in self.end_reasons.items()))
+        lines.append(f"{report['slaps_per_game']:.1f} slaps/game, {report['false_slap_rate']:.1%} false: "
+                     + ", ".join(f"{label} {share:.1%}" for label, share in report["slap_patterns"].items()))
+        lines.append(f"{report['burns_per_game']:.1f} burns/game: "
+                     + ", ".join(f"{reason} {share:.1%}" for reason, share in report["burn_reasons"].items()))
+        lines.append(f"{report['fakes_per_game']:.1f} fakes/game, {report['royal_wins_per_game']:.1f} royal sequences won/game")
+        lines.append(f"{report['pickups_per_game']:.1f} pickups/game of {report['mean_pickup']:.1f} cards "
+                     f"(max {self.max_pickup}): "
+                     + ", ".join(f"{column} {count}" for column, count in report["pickup_sizes"].items()))
+        return "\n".join(lines)
+
+def add_counts(counts, values):
+    for key, count in values.items():
+        counts[key] = counts.get(key, 0) + int(count)
+
+# Summarise a results file written by ResultsSink, chunk_size records at a time
+def summarize_results(path, chunk_size=1000000):
+    summary = StatsSummary()
+    if path.endswith(".parquet"):
+        # Imported here like in ResultsSink, CSV files need no pyarrow
+        import pyarrow.parquet
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=REPORT_COLUMNS):
+            summary.add_frame(batch.to_pandas())
+    else:
+        for frame in pd.read_csv(path, usecols=REPORT_COLUMNS, chunksize=chunk_size):
+            summary.add_frame(frame)
+    return summary
+
+# Plot the summary to an image file, needs matplotlib
+def plot_report(summary, path):
+    # Imported here so summaries work without matplotlib
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    report = summary.as_dict()
+    figure, axes = plt.subplots(2, 2, figsize=(12, 8))
+    axes[0, 0].bar(list(report["slap_patterns"]), list(report["slap_patterns"].values()))
+    axes[0, 0].set_title(f"Slaps by pattern ({report['false_slap_rate']:.1%} false)")
+    axes[0, 1].bar([reason[len("burns_"):] for reason in report["burn_reasons"]], list(report["burn_reasons"].values()))
+    axes[0, 1].set_title("Burns by reason")
+    axes[1, 0].bar([column[len("pickups_"):] for column in report["pickup_sizes"]], list(report["pickup_sizes"].values()))
+    axes[1, 0].set_title(f"Pile size at pickup (mean {report['mean_pickup']:.1f})")
+    used = np.flatnonzero(summary.tick_buckets)
+    if used.size:
+        buckets = range(used[0], used[-1] + 1)
+        axes[1, 1].bar([f"<={1 << bucket}" for bucket in buckets], summary.tick_buckets[used[0]:used[-1] + 1])
+        axes[1, 1].tick_params(axis="x", labelrotation=45)
+    axes[1, 1].set_title(f"Ticks per game (mean {report['mean_ticks']:.0f})")
+    figure.suptitle(f"{summary.games} games")
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise the game statistics of a results file")
+    parser.add_argument("results", help=".parquet or .csv file written with --results")
+    parser.add_argument("--plot", default=None, help="also plot the report to this image file (needs matplotlib)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--chunk-size", type=int, default=1000000, help="records read at a time")
+    args = parser.parse_args()
+
+    summary = summarize_results(args.results, args.chunk_size)
+    print(json.dumps(summary.as_dict(), indent=2) if args.json else summary)
+    if args.plot:
+        plot_report(summary, args.plot)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from multiprocessing import Pool, cpu_count
+import pandas as pd
+from Simulation.tournament import DEFAULT_ROSTER, TournamentResult, game_seed, play_seeded_game
+from Simulation.result_cache import roster_key
+
+## Parameter sweeps over the strategy knobs of the player classes
+# A configuration maps player classes to knob values, e.g.
+#   {RandomFake: {"fake_threshold": 0.5}, Player: {"reaction_jitter": 0.3}}
+# and applies to every player of that class in the roster. Each configuration
+# plays the same seeded games split into blocks, so configurations are compared
+# on common random numbers. Finished blocks are cached on disk per
+# (configuration, seed block) and only missing blocks are simulated. Block keys
+# include the engine and player class sources, so code changes invalidate them.
+# With a ResultCache, the games of missing blocks are also looked up one by one
+
+# Every combination of the listed knob values, space maps player class -> knob -> values
+def grid(space):
+    axes = [(player_class, knob, values) for player_class, knobs in space.items() for knob, values in knobs.items()]
+    configs = []
+    for values in itertools.product(*(values for _, _, values in axes)):
+        config = {}
+        for (player_class, knob, _), value in zip(axes, values):
+            config.setdefault(player_class, {})[knob] = value
+        configs.append(config)
+    return configs
+
+# Random configurations, a (low, high) pair is sampled uniformly and a list is sampled from
+def random_sample(space, samples, seed=0):
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for player_class, knobs in space.items():
+            for knob, values in knobs.items():
+                if isinstance(values, tuple):
+                    value = rng.uniform(*values)
+                else:
+                    value = rng.choice(values)
+                config.setdefault(player_class, {})[knob] = value
+        configs.append(config)
+    return configs
+
+## On-disk cache of the result of each (configuration, seed block)
+class BlockCache:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def block_path(self, roster, config, seed, start, stop):
+        key = json.dumps([roster_key(roster, config), seed, start, stop])
+        return os.path.join(self.path, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, roster, config, seed, start, stop):
+        path = self.block_path(roster, config, seed, start, stop)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return TournamentResult.from_dict(json.load(file))
+
+    # Written to a temporary file first so an interrupted sweep never leaves a partial block
+    def put(self, roster, config, seed, start, stop, result):
+        path = self.block_path(roster, config, seed, start, stop)
+        with open(path + ".tmp", "w") as file:
+            json.dump(result.as_dict(), file)
+        os.replace(path + ".tmp", path)
+
+# Play the games of the given indices of one configuration's block, run inside a worker process
+def play_block(task):
+    index, start, roster, config, seed, games, keep_records = task
+    result = TournamentResult([name for _, name in roster])
+    records = []
+    for game in games:
+        record = play_seeded_game(roster, game_seed(seed, game), knobs=config)
+        result.add_record(record)
+        if keep_records:
+            records.append(record)
+    return index, start, result, records
+
+# Play games per configuration and return a TournamentResult per configuration
+# An extended sweep (more configurations or games) reuses every cached block,
+# and result_cache (a ResultCache) every cached game
+def run_sweep(configs, roster=DEFAULT_ROSTER, games=1000, seed=0, workers=None, block_size=250, cache_dir=None,
+              result_cache=None):
+    if workers is None:
+        workers = cpu_count()
+    workers = max(1, workers)
+    cache = BlockCache(cache_dir) if cache_dir else None
+    names = [name for _, name in roster]
+    results = [TournamentResult(names) for _ in configs]
+    for result in results:
+        result.workers = workers
+
+    tasks = []
+    # (configuration index, block start) -> result of the cached games of a block being played
+    blocks = {}
+    for index, config in enumerate(configs):
+        for start in range(0, games, block_size):
+            stop = min(start + block_size, games)
+            cached = cache.get(roster, config, seed, start, stop) if cache else None
+            if cached:
+                results[index].merge(cached)
+                continue
+            block = TournamentResult(names)
+            missing = range(start, stop)
+            if result_cache is not None:
+                found = result_cache.lookup(roster, [game_seed(seed, game) for game in missing], knobs=config)
+                for record in found.values():
+                    block.add_record(record)
+                missing = [game for game in missing if game_seed(seed, game) not in found]
+            blocks[index, start] = block
+            tasks.append((index, start, roster, config, seed, missing, result_cache is not None))
+
+    start_time = time.perf_counter()
+    def collect(index, start, result, records):
+        block = blocks.pop((index, start))
+        block.merge(result)
+        results[index].merge(block)
+        if result_cache is not None:
+            result_cache.store(roster, records, knobs=configs[index])
+        if cache:
+            cache.put(roster, configs[index], seed, start, min(start + block_size, games), block)
+
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            collect(*play_block(task))
+    else:
+        with Pool(workers) as pool:
+            for block in pool.imap_unordered(play_block, tasks):
+                collect(*block)
+    elapsed = time.perf_counter() - start_time
+    for result in results:
+        result.elapsed = elapsed
+    return results
+
+# One row per configuration with its knob values, win rates and mean ticks
+def sweep_table(configs, results):
+    rows = []
+    for config, result in zip(configs, results):
+        row = {f"{player_class.__name__}.{knob}": value
+               for player_class, knobs in config.items() for knob, value in knobs.items()}
+        for name, wins in result.wins.items():
+            row[f"{name} win rate"] = wins / max(result.games, 1)
+        row["games"] = result.games
+        row["stalemates"] = result.unfinished
+        row["mean ticks"] = result.mean_ticks()
+        rows.append(row)
+    return pd.DataFrame(rows)
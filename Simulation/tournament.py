@@ -0,0 +1,255 @@
+import random
+import time
+import numpy as np
+from multiprocessing import Pool, cpu_count
+from GameFiles.ers_game import Game
+from GameFiles.batch_engine import BatchEngine
+from GameFiles.instrumentation import Instrumentation
+from Players.player import Player
+from Players.random_fake import RandomFake
+from Players.preplay import Preplay
+
+# Default roster as (player class, name) pairs, kept picklable for worker processes
+DEFAULT_ROSTER = [(RandomFake, "Jonathan"), (Preplay, "Dylan"), (Player, "Liam"), (Player, "Kuli")]
+
+# Deterministic seed of a single game, independent of how games are split across workers
+def game_seed(base_seed, index):
+    return (base_seed << 32) | index
+
+# Build fresh players for a roster
+# knobs optionally maps a player class to the knob values of its players
+def build_players(roster, knobs=None):
+    knobs = knobs or {}
+    return [player_class(name, **knobs.get(player_class, {})) for player_class, name in roster]
+
+# Play one game from its seed and return the game record
+# game_options are passed on to Game, e.g. debug, max_ticks or max_piles
+def play_seeded_game(roster, seed, instrumentation=None, tracer=None, knobs=None, **game_options):
+    players = build_players(roster, knobs)
+    # Give random order to player rotation, the game draws everything else from its own streams
+    random.Random(seed).shuffle(players)
+    seating = [player.name for player in players]
+
+    # Play game without printing any messages unless a tracer is given
+    game = Game(players, seed=seed, instrumentation=instrumentation, tracer=tracer, **game_options)
+    winner = game.play_game()
+    return {
+        "seed": seed,
+        "seating": seating,
+        # None for a stalemate
+        "winner": winner.name if winner else None,
+        "end_reason": game.end_reason,
+        "ticks": game.ticks,
+        "slaps": game.slaps,
+        "burns": game.burns,
+        "fakes": game.fakes,
+        "pile_pickups": game.pile_pickups,
+        **game.stats.as_dict(),
+    }
+
+## Merged win counts and game statistics of a tournament
+class TournamentResult:
+    def __init__(self, names):
+        self.wins = {name: 0 for name in names}
+        self.games = 0
+        self.total_ticks = 0
+        self.min_ticks = None
+        self.max_ticks = 0
+        # Games stopped before a winner was found, and their count per end reason
+        self.unfinished = 0
+        self.stalemates = {}
+        self.elapsed = 0.0
+        self.workers = 1
+        # Instrumentation of the games when the tournament was instrumented
+        self.instrumentation = None
+
+    # Count a single game record
+    def add_record(self, record):
+        if record["winner"] is None:
+            self.add_stalemates(record["end_reason"], 1)
+            return
+        self.wins[record["winner"]] += 1
+        self.games += 1
+        ticks = record["ticks"]
+        self.total_ticks += ticks
+        if self.min_ticks is None or ticks < self.min_ticks:
+            self.min_ticks = ticks
+        if ticks > self.max_ticks:
+            self.max_ticks = ticks
+
+    def add_stalemates(self, reason, count):
+        self.unfinished += count
+        self.stalemates[reason] = self.stalemates.get(reason, 0) + count
+
+    # Count the games of a batch engine run from its winner (roster index, -1 if stopped by a budget) and tick arrays
+    def add_batch(self, names, winners, ticks):
+        finished = winners >= 0
+        for name, wins in zip(names, np.bincount(winners[finished], minlength=len(names))):
+            self.wins[name] += int(wins)
+        self.games += int(np.count_nonzero(finished))
+        if not np.all(finished):
+            self.add_stalemates("budget", int(np.count_nonzero(~finished)))
+        if np.any(finished):
+            ticks = ticks[finished]
+            self.total_ticks += int(ticks.sum())
+            if self.min_ticks is None or ticks.min() < self.min_ticks:
+                self.min_ticks = int(ticks.min())
+            self.max_ticks = max(self.max_ticks, int(ticks.max()))
+
+    # Merge the counts of another partial result into this one
+    def merge(self, other):
+        for name, wins in other.wins.items():
+            self.wins[name] = self.wins.get(name, 0) + wins
+        self.games += other.games
+        for reason, count in other.stalemates.items():
+            self.add_stalemates(reason, count)
+        self.total_ticks += other.total_ticks
+        if other.min_ticks is not None and (self.min_ticks is None or other.min_ticks < self.min_ticks):
+            self.min_ticks = other.min_ticks
+        self.max_ticks = max(self.max_ticks, other.max_ticks)
+        if other.instrumentation:
+            if self.instrumentation is None:
+                self.instrumentation = Instrumentation()
+            self.instrumentation.merge(other.instrumentation)
+
+    # Plain dictionary of the counts, ready for json.dump
+    def as_dict(self):
+        return {
+            "wins": self.wins,
+            "games": self.games,
+            "total_ticks": self.total_ticks,
+            "min_ticks": self.min_ticks,
+            "max_ticks": self.max_ticks,
+            "stalemates": self.stalemates,
+        }
+
+    @classmethod
+    def from_dict(cls, counts):
+        result = cls(counts["wins"])
+        result.wins.update(counts["wins"])
+        result.games = counts["games"]
+        result.total_ticks = counts["total_ticks"]
+        result.min_ticks = counts["min_ticks"]
+        result.max_ticks = counts["max_ticks"]
+        for reason, count in counts["stalemates"].items():
+            result.add_stalemates(reason, count)
+        return result
+
+    def games_per_sec(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.games / self.elapsed
+
+    def mean_ticks(self):
+        if self.games == 0:
+            return 0.0
+        return self.total_ticks / self.games
+
+    def __str__(self):
+        lines = [f"{name} won {wins} games" for name, wins in self.wins.items()]
+        lines.append(f"{self.games} games in {self.elapsed:.2f}s on {self.workers} worker(s) "
+                     f"({self.games_per_sec():.1f} games/sec, {self.mean_ticks():.1f} ticks/game)")
+        if self.unfinished:
+            reasons = ", ".join(f"{count} {reason}" for reason, count in self.stalemates.items())
+            lines.append(f"{self.unfinished} games stopped as stalemates ({reasons})")
+        return "\n".join(lines)
+
+# Play the games of the given indices of a tournament, run inside a worker process
+# The game records are sent back only when a results sink or cache wants them
+def play_chunk(task):
+    roster, base_seed, indices, keep_records, instrument, game_options = task
+    result = TournamentResult([name for _, name in roster])
+    if instrument:
+        result.instrumentation = Instrumentation()
+    records = [] if keep_records else None
+    for index in indices:
+        record = play_seeded_game(roster, game_seed(base_seed, index), result.instrumentation, **game_options)
+        result.add_record(record)
+        if keep_records:
+            records.append(record)
+    return result, records
+
+# Split the game indices into chunks, several per worker to balance long games
+def make_chunks(games, workers, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = max(1, min(1000, games // (workers * 8)))
+    return [(start, min(start + chunk_size, games)) for start in range(0, games, chunk_size)]
+
+# Run a seeded tournament across a process pool
+# Every game record is streamed to sink (a ResultsSink) when one is given
+# and instrument collects the phase timings of every game into result.instrumentation
+# game_options are passed on to every Game, e.g. debug=True checks card conservation throughout
+# Games found in cache (a ResultCache) are not simulated again, instrumented runs bypass it
+def run_tournament(games, roster=DEFAULT_ROSTER, seed=0, workers=None, chunk_size=None, sink=None, instrument=False,
+                   cache=None, **game_options):
+    if workers is None:
+        workers = cpu_count()
+    workers = max(1, workers)
+    if instrument:
+        cache = None
+    keep_records = sink is not None or cache is not None
+
+    result = TournamentResult([name for _, name in roster])
+    result.workers = workers
+    start_time = time.perf_counter()
+
+    missing = range(games)
+    if cache is not None:
+        cached = cache.lookup(roster, [game_seed(seed, index) for index in missing], game_options=game_options)
+        for record in cached.values():
+            result.add_record(record)
+        if sink is not None:
+            sink.add_records(cached.values())
+        missing = [index for index in missing if game_seed(seed, index) not in cached]
+    tasks = [(roster, seed, missing[start:stop], keep_records, instrument, game_options)
+             for start, stop in make_chunks(len(missing), workers, chunk_size)]
+
+    def collect(partial, records):
+        result.merge(partial)
+        if sink is not None:
+            sink.add_records(records)
+        if cache is not None:
+            cache.store(roster, records, game_options=game_options)
+
+    if workers == 1:
+        for task in tasks:
+            collect(*play_chunk(task))
+    else:
+        with Pool(workers) as pool:
+            for partial, records in pool.imap_unordered(play_chunk, tasks):
+                collect(partial, records)
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+# Run a tournament on the lockstep batch engine, one block of games per task
+def run_batch_chunk(task):
+    roster, seed, games, batch_size, engine_options = task
+    engine = BatchEngine(roster, batch_size=batch_size, seed=seed, **engine_options)
+    winners, ticks, _ = engine.run(games)
+    result = TournamentResult([name for _, name in roster])
+    result.add_batch(engine.names, winners, ticks)
+    return result
+
+# Games are split into blocks of batch_size games, each seeded from its block index,
+# so the games played do not depend on how many workers share the blocks
+# engine_options are passed on to every BatchEngine, e.g. max_ticks, max_piles or decks
+def run_batch_tournament(games, roster=DEFAULT_ROSTER, seed=0, workers=None, batch_size=8192, **engine_options):
+    if workers is None:
+        workers = cpu_count()
+    tasks = [(roster, game_seed(seed, block), min(batch_size, games - start), batch_size, engine_options)
+             for block, start in enumerate(range(0, games, batch_size))]
+    workers = max(1, min(workers, len(tasks)))
+
+    result = TournamentResult([name for _, name in roster])
+    result.workers = workers
+    start_time = time.perf_counter()
+    if workers == 1:
+        for task in tasks:
+            result.merge(run_batch_chunk(task))
+    else:
+        with Pool(workers) as pool:
+            # Merged in block order
+            for partial in pool.imap(run_batch_chunk, tasks):
+                result.merge(partial)
+    result.elapsed = time.perf_counter() - start_time
+    return result
@@ -1,32 +1,90 @@
-from GameFiles.ers_game import Game
-from Players.player import Player
-from Players.never_slap import NeverSlap
-from Players.random_fake import RandomFake
-from Players.preplay import Preplay
-from random import shuffle
-
-def new_game():
-    players = [RandomFake("Jonathan"), Preplay("Dylan"), Player("Liam"), Player("Kuli")]
-    # Give random order to player rotation
-    shuffle(players)
-
-    # Play game without printing any messages
-    game = Game(players, print_messages=False)
-    return game.play_game().name
+import argparse
+from random import getrandbits
+from Simulation.tournament import DEFAULT_ROSTER, game_seed, play_seeded_game, run_batch_tournament, run_tournament
+
+def new_game(seed=None):
+    if seed is None:
+        seed = getrandbits(64)
+    return play_seeded_game(DEFAULT_ROSTER, seed)["winner"]
 
 def main():
-    player_wins = {
-        "Jonathan": 0, 
-        "Dylan": 0, 
-        "Liam": 0, 
-        "Kuli": 0
-    }
-    for _ in range(100):
-        winner_name = new_game()
-        player_wins[winner_name] += 1
-    
-    for player in player_wins:
-        print(f"{player} won {player_wins[player]} games")
+    parser = argparse.ArgumentParser(description="Run an ERS tournament")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the tournament")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--engine", choices=["game", "batch"], default="game", help="object-per-game or lockstep batch engine")
+    parser.add_argument("--results", default=None, help="stream per-game records to a .csv file, or a .parquet file with pyarrow")
+    parser.add_argument("--cache", default=None, help="SQLite cache of finished games to reuse across runs")
+    parser.add_argument("--instrument", action="store_true", help="time the phases of the game loop")
+    parser.add_argument("--debug", action="store_true", help="check card conservation throughout every game")
+    parser.add_argument("--low-alloc", action="store_true",
+                        help="reuse one event per game and pool the actions to cut allocations per tick")
+    parser.add_argument("--decks", type=int, default=1, help="decks shuffled together into every deal")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="ticks after which a game is a stalemate")
+    parser.add_argument("--max-piles", type=int, default=10000, help="pile pickups after which a game is a stalemate")
+    parser.add_argument("--trace", type=int, default=None, metavar="GAME",
+                        help="print the full debug trace of one game of the tournament and exit")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="stop once the ranking is significant, --games becomes the maximum")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence of the adaptive tournament")
+    parser.add_argument("--precision", type=float, default=None,
+                        help="stop the adaptive tournament once every win rate is known to +/- this instead")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="win-rate difference under which the adaptive tournament settles a pair as a tie")
+    parser.add_argument("--validate", action="store_true", help="compare the batch engine's win rates against the game engine")
+    args = parser.parse_args()
+
+    if args.validate:
+        from Simulation.batch_validation import format_validation, validate_batch_engine
+        print(format_validation(validate_batch_engine(args.games, DEFAULT_ROSTER, seed=args.seed, workers=args.workers)))
+        return
+
+    # Options of every Game, the traced game is played with the same ones as the tournament
+    game_options = {"debug": args.debug, "max_ticks": args.max_ticks, "max_piles": args.max_piles,
+                    "low_alloc": args.low_alloc, "decks": args.decks}
+
+    if args.trace is not None:
+        from GameFiles.tracing import DEBUG, Tracer
+        play_seeded_game(DEFAULT_ROSTER, game_seed(args.seed, args.trace), tracer=Tracer(DEBUG),
+                         **{**game_options, "debug": True})
+        return
+
+    if args.engine == "batch":
+        # The batch engine keeps no per-game records and has no phase timings, invariant checks or action objects
+        for option in ("results", "cache", "instrument", "debug", "low_alloc"):
+            if getattr(args, option):
+                parser.error(f"--{option.replace('_', '-')} is not supported by the batch engine")
+        game_options = {"max_ticks": args.max_ticks, "max_piles": args.max_piles, "decks": args.decks}
+
+    if args.adaptive:
+        # Adaptive tournaments only keep the win counts of each look
+        for option in ("results", "cache", "instrument"):
+            if getattr(args, option):
+                parser.error(f"--{option} is not supported by adaptive tournaments")
+        from Simulation.adaptive import run_adaptive_tournament
+        print(run_adaptive_tournament(DEFAULT_ROSTER, confidence=args.confidence, max_games=args.games,
+                                      precision=args.precision, tolerance=args.tolerance, seed=args.seed,
+                                      workers=args.workers, engine=args.engine, **game_options))
+        return
+
+    if args.engine == "batch":
+        print(run_batch_tournament(args.games, DEFAULT_ROSTER, seed=args.seed, workers=args.workers, **game_options))
+        return
+
+    if args.cache:
+        from Simulation.result_cache import ResultCache
+        game_options["cache"] = ResultCache(args.cache)
+    if args.results:
+        from Simulation.results_sink import ResultsSink
+        with ResultsSink(args.results) as sink:
+            result = run_tournament(args.games, DEFAULT_ROSTER, seed=args.seed, workers=args.workers, sink=sink,
+                                    instrument=args.instrument, **game_options)
+    else:
+        result = run_tournament(args.games, DEFAULT_ROSTER, seed=args.seed, workers=args.workers,
+                                instrument=args.instrument, **game_options)
+    print(result)
+    if result.instrumentation:
+        print(result.instrumentation)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,9 @@
+from Players.player import Player
+from Simulation.adaptive import run_adaptive_tournament
+
+# Two seats of the same strategy never differ, the tournament has to settle them as a tie
+def test_identical_players_stop_early():
+    roster = [(Player, "Liam"), (Player, "Kuli")]
+    adaptive = run_adaptive_tournament(roster, max_games=100000, tolerance=0.15, workers=1, engine="batch")
+    assert adaptive.stopped == "ranking"
+    assert adaptive.result.games + adaptive.result.unfinished < 100000
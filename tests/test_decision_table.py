@@ -0,0 +1,11 @@
+from Players.decision_table import TablePlayer, TablePreplay, TableRandomFake
+from Simulation.tournament import DEFAULT_ROSTER, game_seed, play_seeded_game
+
+# The default roster with compiled decision table strategies
+TABLE_ROSTER = [(TableRandomFake, "Jonathan"), (TablePreplay, "Dylan"), (TablePlayer, "Liam"), (TablePlayer, "Kuli")]
+
+# Compiled strategies draw in the same order as the Player subclasses, so they play the same seeded games
+def test_compiled_strategies_play_the_same_games():
+    for index in range(20):
+        seed = game_seed(0, index)
+        assert play_seeded_game(TABLE_ROSTER, seed) == play_seeded_game(DEFAULT_ROSTER, seed)
@@ -0,0 +1,34 @@
+import asyncio
+from GameFiles.game_recorder import CARD, LEAVE, SLAP
+from Server import protocol
+from Server.game_server import GameServer
+from Simulation.tournament import DEFAULT_ROSTER
+
+# A client answering every event with out of range seats, unknown codes, a seat leaving with cards
+# in hand and a card from every seat, twice. Debug games check no card is lost
+async def play_bad_client(games_per_table):
+    server = GameServer(games_per_table=games_per_table, deadline=0.5, tables=1, max_ticks=500, debug=True)
+    listener = await server.start()
+    reader, writer = await asyncio.open_connection("127.0.0.1", listener.sockets[0].getsockname()[1])
+    writer.write(protocol.encode_hello(1, DEFAULT_ROSTER))
+    ends = []
+    while len(ends) < games_per_table:
+        message_type, payload = await asyncio.wait_for(protocol.read_frame(reader), 10)
+        if message_type == protocol.EVENT:
+            table_id, tick = protocol.decode_event(payload)[:2]
+            actions = [(200, SLAP, 0.1), (0, 0, 0.1), (1, 99, 0.1), (2, SLAP, float("nan")), (3, LEAVE, -1.0)]
+            actions += [(seat, CARD, 0.1 + seat / 10) for seat in range(len(DEFAULT_ROSTER))] * 2
+            writer.write(protocol.encode_actions(table_id, tick, actions))
+        elif message_type == protocol.TABLE_END:
+            ends.append(protocol.decode_table_end(payload))
+    writer.close()
+    await server.done.wait()
+    await server.wait_closed()
+    return server, ends
+
+def test_invalid_actions_are_dropped():
+    server, ends = asyncio.run(play_bad_client(2))
+    summary = server.summary()
+    assert len(ends) == 2
+    assert summary["games"] == 2 and summary["errors"] == 0
+    assert summary["invalid"] >= 5 * summary["ticks"]
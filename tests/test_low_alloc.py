@@ -0,0 +1,7 @@
+from Simulation.tournament import DEFAULT_ROSTER, game_seed, play_seeded_game
+
+# Reusing the event and pooling the actions must not change how a seeded game plays out
+def test_low_alloc_plays_the_same_games():
+    for index in range(20):
+        seed = game_seed(0, index)
+        assert play_seeded_game(DEFAULT_ROSTER, seed, low_alloc=True) == play_seeded_game(DEFAULT_ROSTER, seed)
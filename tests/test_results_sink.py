@@ -0,0 +1,19 @@
+import pytest
+from Players.player import Player
+from Simulation.results_sink import ResultsSink, load_results
+from Simulation.tournament import play_seeded_game
+
+ROSTER = [(Player, "Liam"), (Player, "Kuli")]
+
+# A chunk of stalemates only has None winners, the next chunk must still fit its schema
+def test_parquet_chunk_of_stalemates(tmp_path):
+    pytest.importorskip("pyarrow")
+    stalemate = play_seeded_game(ROSTER, 0, max_ticks=1)
+    finished = play_seeded_game(ROSTER, 0)
+    assert stalemate["winner"] is None and finished["winner"] is not None
+    path = str(tmp_path / "results.parquet")
+    with ResultsSink(path, chunk_size=1) as sink:
+        sink.add_records([stalemate, stalemate, finished])
+    results = load_results(path)
+    assert results["winner"].isna().tolist() == [True, True, False]
+    assert results["ticks"].tolist() == [1, 1, finished["ticks"]]